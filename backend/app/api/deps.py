@@ -7,14 +7,13 @@ from fastapi.security import OAuth2PasswordBearer
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.redis import redis_client
 from app.core.security import TokenType, decode_token
 from app.db.models.enums import UserRole
 from app.db.models.user import User
 from app.db.session import get_session
 
 _oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
-_redis_client: Redis | None = Redis.from_url(settings.redis_url, decode_responses=True) if settings.redis_url else None
 
 
 async def get_session_dep() -> AsyncIterator[AsyncSession]:
@@ -23,7 +22,7 @@ async def get_session_dep() -> AsyncIterator[AsyncSession]:
 
 
 async def get_redis() -> Redis | None:
-    return _redis_client
+    return redis_client
 
 
 async def get_current_user(
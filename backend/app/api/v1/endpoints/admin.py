@@ -22,8 +22,8 @@ from ..schemas.order_window import OrderWindowRequest, OrderWindowResponse
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-def _build_menu_service(session: AsyncSession) -> MenuService:
-    return MenuService(session)
+def _build_menu_service(session: AsyncSession, redis: Redis | None = None) -> MenuService:
+    return MenuService(session, redis=redis)
 
 
 def _build_order_window_service(session: AsyncSession) -> OrderWindowService:
@@ -82,12 +82,13 @@ async def set_menu_day(
     request: MenuUpdateRequest,
     admin=Depends(get_current_admin),
     session: AsyncSession = Depends(get_session_dep),
+    redis: Redis | None = Depends(get_redis),
 ) -> MenuResponse:
     try:
         enum_day = DayOfWeek(day)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Неверный день недели") from exc
-    service = _build_menu_service(session)
+    service = _build_menu_service(session, redis)
     week = await service.get_or_create_current_week()
     await service.upsert_day_items(week, day=enum_day, items=request.items)
     payload = await service.serialize_week(week)
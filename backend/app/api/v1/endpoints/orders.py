@@ -4,6 +4,7 @@ from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from redis.asyncio import Redis
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_redis, get_session_dep
@@ -60,6 +61,13 @@ def _order_to_response(order: Order) -> OrderResponse:
     )
 
 
+async def _load_timestamps(session: AsyncSession, order: Order) -> None:
+    # INSERT ... RETURNING already populates server defaults; only UPDATEs expire them.
+    unloaded = inspect(order).unloaded
+    if "created_at" in unloaded or "updated_at" in unloaded:
+        await session.refresh(order, attribute_names=["created_at", "updated_at"])
+
+
 def _build_services(session: AsyncSession, redis: Redis | None = None) -> OrderService:
     menu_service = MenuService(session)
     window_service = OrderWindowService(session)
@@ -195,7 +203,6 @@ async def checkout_planner_order(
         ) from err
 
     await user_service.update_profile(user, address=request.address)
-    await session.flush()
 
     return PlannerCheckoutResponse(
         templateId=result.template_id,
@@ -263,8 +270,7 @@ async def create_order(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Недоступная неделя заказа")
 
         await user_service.update_profile(user, address=request.address, phone=request.phone)
-        await session.flush()
-        await session.refresh(order, attribute_names=["created_at", "updated_at"])
+        await _load_timestamps(session, order)
 
         return _order_to_response(order)
 
@@ -273,20 +279,28 @@ async def create_order(
 async def list_orders(
     mine: int | None = Query(default=None),
     week: date | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
     user=Depends(get_current_user),
     session: AsyncSession = Depends(get_session_dep),
 ) -> OrderListResponse:
     order_service = _build_services(session)
 
     if mine == 1 or user.role != UserRole.ADMIN:
-        orders = await order_service.list_orders_for_user(user=user)
-        return OrderListResponse(orders=[_order_to_response(order) for order in orders])
+        # One extra row tells whether another page exists without a COUNT query.
+        orders = await order_service.list_orders_for_user(user=user, limit=limit + 1, offset=offset)
+        has_more = len(orders) > limit
+        return OrderListResponse(
+            orders=[_order_to_response(order) for order in orders[:limit]],
+            hasMore=has_more,
+            nextOffset=offset + limit if has_more else None,
+        )
 
     if week is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="week parameter required for admin view")
 
-    orders = await order_service.list_orders_for_week(week_start=week)
-    return OrderListResponse(orders=[_order_to_response(order) for order in orders])
+    orders = order_service.stream_orders_for_week(week_start=week)
+    return OrderListResponse(orders=[_order_to_response(order) async for order in orders])
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -339,8 +353,7 @@ async def update_order(
     if not updated_order:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Нет данных для обновления")
 
-    await session.flush()
-    await session.refresh(updated_order, attribute_names=["created_at", "updated_at"])
+    await _load_timestamps(session, updated_order)
 
     return _order_to_response(updated_order)
 
@@ -361,7 +374,6 @@ async def cancel_order(
     except ForbiddenOrderActionError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=err.reason) from err
 
-    await session.flush()
-    await session.refresh(order, attribute_names=["created_at", "updated_at"])
+    await _load_timestamps(session, order)
 
     return _order_to_response(order)
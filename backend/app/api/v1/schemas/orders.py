@@ -40,6 +40,9 @@ class OrderResponse(BaseModel):
 
 class OrderListResponse(BaseModel):
     orders: list[OrderResponse]
+    # Only the paginated customer history sets these; the admin week view is complete.
+    hasMore: bool = False
+    nextOffset: int | None = None
 
 
 class PlannerSelectionRequest(BaseModel):
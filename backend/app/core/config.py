@@ -26,7 +26,12 @@ class Settings(BaseSettings):
     debug: bool = True
 
     database_url: PostgresDsn | None = None
+    database_pool_size: int = Field(default=10)
+    database_max_overflow: int = Field(default=20)
+    database_pool_timeout_seconds: int = Field(default=30)
+    database_pool_recycle_seconds: int = Field(default=1800)
     redis_url: str | None = "redis://localhost:6379/0"
+    redis_max_connections: int = Field(default=50)
 
     s3_endpoint_url: AnyHttpUrl | None = None
     s3_bucket: str = "batumi-lunch-media"
@@ -37,18 +42,27 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_access_token_ttl_minutes: int = 30
     jwt_refresh_token_ttl_minutes: int = 7 * 24 * 60
+    password_hash_workers: int = Field(
+        default=2, description="Concurrent password hashes per process; argon2id uses ~46 MiB each"
+    )
 
     order_price_lari: int = Field(default=15)
     order_daily_limit: int = Field(default=4)
     order_rate_limit_window_seconds: int = Field(default=10)
     orders_rate_limit_redis_key_prefix: str = Field(default="rate:orders")
     broadcasts_rate_limit_key_prefix: str = Field(default="rate:broadcasts")
+    menu_cache_prefix: str = Field(default="cache:menu")
+    menu_cache_ttl_seconds: int = Field(default=600)
 
     admin_email: str | None = None
     admin_telegram_id: int | None = None
 
     cors_allow_origins: list[AnyHttpUrl] | None = None
 
+    openapi_schema_path: str | None = Field(
+        default=None, description="Prebuilt openapi.json served instead of generating the schema"
+    )
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from redis.asyncio import ConnectionPool, Redis
+
+from .config import settings
+
+# One pool per process, shared by the API dependencies and the health checks.
+redis_pool: ConnectionPool | None = (
+    ConnectionPool.from_url(
+        str(settings.redis_url),
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+    )
+    if settings.redis_url
+    else None
+)
+redis_client: Redis | None = Redis(connection_pool=redis_pool) if redis_pool else None
+
+
+__all__ = ["redis_client", "redis_pool"]
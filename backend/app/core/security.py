@@ -8,9 +8,17 @@ from passlib.context import CryptContext
 
 from .config import settings
 
+# New hashes use argon2id through the libargon2 C binding (argon2-cffi) with
+# m=46 MiB, t=3, p=2; existing bcrypt hashes keep verifying.
 _pwd_context = CryptContext(
-    schemes=["bcrypt_sha256", "bcrypt"],
+    schemes=["argon2", "bcrypt_sha256", "bcrypt"],
     deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=47104,
+    argon2__time_cost=3,
+    argon2__parallelism=2,
+    argon2__digest_size=32,
+    argon2__salt_size=16,
 )
 
 
@@ -27,6 +35,12 @@ def verify_password(password: str, password_hash: str) -> bool:
     return _pwd_context.verify(password, password_hash)
 
 
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """Verify ``password``; also return a fresh hash when the stored one uses outdated settings."""
+
+    return _pwd_context.verify_and_update(password, password_hash)
+
+
 def _create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
     now = datetime.now(tz=timezone.utc)
     payload: dict[str, Any] = {
@@ -67,5 +81,6 @@ __all__ = [
     "create_refresh_token",
     "decode_token",
     "hash_password",
+    "verify_and_update_password",
     "verify_password",
 ]
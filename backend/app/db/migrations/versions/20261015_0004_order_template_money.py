@@ -0,0 +1,57 @@
+"""Tighten order template money columns
+
+Revision ID: 20261015_0004
+Revises: 20240725_0003
+Create Date: 2026-10-15
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261015_0004"
+down_revision = "20240725_0003"
+branch_labels = None
+depends_on = None
+
+
+_TOTAL_MISMATCHES = sa.text(
+    "SELECT count(*) FROM order_templates WHERE total <> subtotal - discount"
+)
+
+
+def upgrade() -> None:
+    # total is derived from subtotal and discount, but which of the three is wrong in a
+    # mismatching row is not knowable here; fail with a count rather than a raw violation.
+    mismatches = op.get_bind().execute(_TOTAL_MISMATCHES).scalar_one()
+    if mismatches:
+        raise RuntimeError(
+            f"Cannot add ck_order_templates_total: {mismatches} order_templates row(s) have "
+            "total <> subtotal - discount. Fix those rows, then re-run the migration."
+        )
+    op.alter_column(
+        "order_templates",
+        "currency",
+        type_=sa.CHAR(length=3),
+        existing_type=sa.String(length=8),
+        existing_nullable=False,
+        existing_server_default="GEL",
+    )
+    op.create_check_constraint(
+        "ck_order_templates_total",
+        "order_templates",
+        "total = subtotal - discount",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_order_templates_total", "order_templates", type_="check")
+    op.alter_column(
+        "order_templates",
+        "currency",
+        type_=sa.String(length=8),
+        existing_type=sa.CHAR(length=3),
+        existing_nullable=False,
+        existing_server_default="GEL",
+    )
@@ -0,0 +1,33 @@
+"""Make the menu_weeks.week_start unique index covering
+
+Revision ID: 20261015_0005
+Revises: 20261015_0004
+Create Date: 2026-10-15
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261015_0005"
+down_revision = "20261015_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Replace the implicit unique constraint with one unique covering index, so writes
+    # maintain a single index on week_start.
+    op.create_index(
+        "uq_menu_weeks_week_start",
+        "menu_weeks",
+        ["week_start"],
+        unique=True,
+        postgresql_include=["week_label", "is_current", "updated_at"],
+    )
+    op.drop_constraint("menu_weeks_week_start_key", "menu_weeks", type_="unique")
+
+
+def downgrade() -> None:
+    op.create_unique_constraint("menu_weeks_week_start_key", "menu_weeks", ["week_start"])
+    op.drop_index("uq_menu_weeks_week_start", table_name="menu_weeks")
@@ -0,0 +1,53 @@
+"""Enforce one active order per user, day and week
+
+Revision ID: 20261015_0006
+Revises: 20261015_0005
+Create Date: 2026-10-15
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261015_0006"
+down_revision = "20261015_0005"
+branch_labels = None
+depends_on = None
+
+
+_ACTIVE_DUPLICATES = sa.text(
+    "SELECT user_id, day_of_week, delivery_week_start, count(*) AS orders FROM orders "
+    "WHERE status IN ('new', 'confirmed') "
+    "GROUP BY user_id, day_of_week, delivery_week_start HAVING count(*) > 1 "
+    "ORDER BY delivery_week_start, user_id, day_of_week"
+)
+
+
+def upgrade() -> None:
+    # Which duplicate to cancel is an operator decision; name them instead of failing
+    # on a raw unique violation halfway through the upgrade.
+    duplicates = op.get_bind().execute(_ACTIVE_DUPLICATES).all()
+    if duplicates:
+        listed = ", ".join(
+            f"user {user_id} / {day} / {week_start} ({orders})"
+            for user_id, day, week_start, orders in duplicates[:20]
+        )
+        more = f" and {len(duplicates) - 20} more" if len(duplicates) > 20 else ""
+        raise RuntimeError(
+            "Cannot add uq_orders_active_user_day_week: several active orders share a "
+            f"user, day and week: {listed}{more}. Cancel the extra orders, then re-run."
+        )
+
+    op.create_index(
+        "uq_orders_active_user_day_week",
+        "orders",
+        ["user_id", "day_of_week", "delivery_week_start"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('new', 'confirmed')"),
+        sqlite_where=sa.text("status IN ('new', 'confirmed')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_orders_active_user_day_week", table_name="orders")
@@ -0,0 +1,43 @@
+"""Store user emails in canonical lower case
+
+Revision ID: 20261015_0007
+Revises: 20261015_0006
+Create Date: 2026-10-15
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261015_0007"
+down_revision = "20261015_0006"
+branch_labels = None
+depends_on = None
+
+
+_CASE_COLLISIONS = sa.text(
+    "SELECT lower(email) AS email, count(*) AS accounts FROM users "
+    "WHERE email IS NOT NULL GROUP BY lower(email) HAVING count(*) > 1 ORDER BY 1"
+)
+
+
+def upgrade() -> None:
+    # Accounts that differ only by case would violate the unique index once lowered.
+    # Which one to keep is a data decision, so stop and name them instead of guessing.
+    collisions = op.get_bind().execute(_CASE_COLLISIONS).all()
+    if collisions:
+        listed = ", ".join(f"{email} ({accounts})" for email, accounts in collisions)
+        raise RuntimeError(
+            "Cannot lower-case users.email: these addresses belong to several accounts "
+            f"that differ only by case: {listed}. Merge or rename them, then re-run."
+        )
+
+    # Lookups compare against the plain unique index on users.email, so rows must
+    # already be lower case for them to match.
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.create_check_constraint("ck_users_email_lower", "users", "email = lower(email)")
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_users_email_lower", "users", type_="check")
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import JSON, Date, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import JSON, Date, DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -13,10 +13,20 @@ from .enums import DayOfferStatus, DayOfWeek
 
 class MenuWeek(TimestampMixin, Base):
     __tablename__ = "menu_weeks"
+    __table_args__ = (
+        # The only index on week_start: enforces uniqueness (and serves as the ON CONFLICT
+        # arbiter) while covering the week lookup's other columns.
+        Index(
+            "uq_menu_weeks_week_start",
+            "week_start",
+            unique=True,
+            postgresql_include=("week_label", "is_current", "updated_at"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     week_label: Mapped[str] = mapped_column(String(128), nullable=False)
-    week_start: Mapped[date | None] = mapped_column(Date, unique=True, nullable=True)
+    week_start: Mapped[date | None] = mapped_column(Date, nullable=True)
     is_current: Mapped[bool] = mapped_column(default=False)
     day_photos: Mapped[dict[str, str] | None] = mapped_column(JSON, default=dict)
 
@@ -2,13 +2,29 @@ from __future__ import annotations
 
 import uuid
 from datetime import date
+from typing import Any, ClassVar
 
-from sqlalchemy import JSON, Boolean, CheckConstraint, Date, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    CheckConstraint,
+    Date,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, TimestampMixin
 from .enums import DayOfWeek, OrderStatus
 
+# Predicate of the partial unique index: one active order per user, day and week.
+ACTIVE_ORDER_PREDICATE = "status IN ('new', 'confirmed')"
+
 
 class Order(TimestampMixin, Base):
     __tablename__ = "orders"
@@ -46,7 +62,18 @@ class Order(TimestampMixin, Base):
     __table_args__ = (
         CheckConstraint("count >= 1", name="ck_orders_count_min"),
         CheckConstraint("count <= 12", name="ck_orders_count_max"),
+        Index(
+            "uq_orders_active_user_day_week",
+            "user_id",
+            "day_of_week",
+            "delivery_week_start",
+            unique=True,
+            postgresql_where=text(ACTIVE_ORDER_PREDICATE),
+            sqlite_where=text(ACTIVE_ORDER_PREDICATE),
+        ),
     )
+    # Status changes read back the server-set updated_at via UPDATE ... RETURNING.
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
 
 
-__all__ = ["Order"]
+__all__ = ["ACTIVE_ORDER_PREDICATE", "Order"]
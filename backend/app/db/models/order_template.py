@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import date
 
-from sqlalchemy import JSON, Boolean, Date, ForeignKey, Integer, String, Text
+from sqlalchemy import CHAR, JSON, Boolean, CheckConstraint, Date, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,6 +12,9 @@ from .base import Base, TimestampMixin
 
 class OrderTemplate(TimestampMixin, Base):
     __tablename__ = "order_templates"
+    __table_args__ = (
+        CheckConstraint("total = subtotal - discount", name="ck_order_templates_total"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID | None] = mapped_column(
@@ -25,7 +28,7 @@ class OrderTemplate(TimestampMixin, Base):
     subtotal: Mapped[int] = mapped_column(Integer, default=0)
     discount: Mapped[int] = mapped_column(Integer, default=0)
     total: Mapped[int] = mapped_column(Integer, default=0)
-    currency: Mapped[str] = mapped_column(String(8), default="GEL")
+    currency: Mapped[str] = mapped_column(CHAR(3), default="GEL", server_default="GEL")
     delivery_zone: Mapped[str | None] = mapped_column(String(64), nullable=True)
     delivery_available: Mapped[bool] = mapped_column(Boolean, default=False)
 
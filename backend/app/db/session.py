@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import (
@@ -18,15 +19,41 @@ _DEFAULT_SQLITE_URL = "sqlite+aiosqlite:///./batumi_lunch.db"
 def _build_engine() -> AsyncEngine:
     url = str(settings.database_url or _DEFAULT_SQLITE_URL)
     connect_args: dict[str, object] = {}
+    pool_args: dict[str, object] = {}
     if url.startswith("sqlite"):
         connect_args["check_same_thread"] = False
-    return create_async_engine(url, echo=settings.debug, connect_args=connect_args)
+    else:
+        # LIFO hands out the most recently used connection, keeping its server-side
+        # statement cache warm and letting surplus connections idle out.
+        pool_args = {
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout_seconds,
+            "pool_recycle": settings.database_pool_recycle_seconds,
+            "pool_pre_ping": True,
+            "pool_use_lifo": True,
+        }
+    return create_async_engine(url, echo=settings.debug, connect_args=connect_args, **pool_args)
 
 
 engine = _build_engine()
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 
+_AFTER_COMMIT_KEY = "after_commit"
+logger = logging.getLogger(__name__)
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Schedule ``callback`` to run once ``get_session`` has committed ``session``.
+
+    For side effects outside the database, such as cache invalidation, that must not
+    happen before the data they describe is visible. Dropped if the session rolls back.
+    """
+
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
 @asynccontextmanager
 async def get_session() -> AsyncIterator[AsyncSession]:
     session = async_session_factory()
@@ -37,7 +64,14 @@ async def get_session() -> AsyncIterator[AsyncSession]:
         await session.rollback()
         raise
     finally:
+        callbacks = session.info.pop(_AFTER_COMMIT_KEY, ())
         await session.close()
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:
+            # The data is committed; a failed side effect must not turn that into an error.
+            logger.exception("After-commit callback failed")
 
 
-__all__ = ["engine", "async_session_factory", "get_session"]
+__all__ = ["engine", "async_session_factory", "get_session", "run_after_commit"]
@@ -1,3 +1,3 @@
-from .service import MenuDay, MenuService
+from .service import MenuDay, MenuService, menu_items_cache_key
 
-__all__ = ["MenuService", "MenuDay"]
+__all__ = ["MenuService", "MenuDay", "menu_items_cache_key"]
@@ -1,18 +1,42 @@
 from __future__ import annotations
 
 import logging
+import time
 import uuid
+from collections.abc import Sequence
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Iterable
+from datetime import date, datetime
+from functools import partial
 
-from sqlalchemy import and_, select
+from redis.asyncio import Redis
+from sqlalchemy import and_, bindparam, inspect, select
 from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.core.config import settings
 from app.db.models.enums import DayOfferStatus, DayOfWeek
 from app.db.models.menu import DayOffer, MenuItem, MenuWeek
+from app.db.session import run_after_commit
+
+_WEEK_BY_START = select(MenuWeek).where(MenuWeek.week_start == bindparam("ws")).limit(1)
+_LATEST_WEEK = (
+    select(MenuWeek)
+    .order_by(MenuWeek.week_start.desc().nullslast(), MenuWeek.created_at.desc())
+    .limit(1)
+)
+_CURRENT_FALLBACK = (
+    select(MenuWeek)
+    .where(MenuWeek.is_current.is_(True))
+    .order_by(MenuWeek.updated_at.desc(), MenuWeek.created_at.desc())
+    .limit(1)
+)
+
+# Day offers arrived in a later migration. A positive probe is cached for good; a negative
+# one only for a minute, so a running process picks the table up after the migration.
+_DAY_OFFERS_RECHECK_SECONDS = 60.0
+_day_offers_table_exists = False
+_day_offers_checked_at: float | None = None
 
 
 @dataclass(slots=True)
@@ -42,8 +66,9 @@ class MenuWeekPayload:
 
 
 class MenuService:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, *, redis: Redis | None = None) -> None:
         self.session = session
+        self.redis = redis
 
     async def get_week(
         self,
@@ -52,37 +77,28 @@ class MenuService:
         for_date: date | None = None,
         fallback: bool = True,
     ) -> MenuWeek | None:
-        primary_stmt = select(MenuWeek)
+        if week_start is None and for_date is not None:
+            week_start = _week_start(for_date)
         if week_start:
-            primary_stmt = primary_stmt.where(MenuWeek.week_start == week_start)
-        elif for_date:
-            monday = _week_start(for_date)
-            primary_stmt = primary_stmt.where(MenuWeek.week_start == monday)
+            result = await self.session.execute(_WEEK_BY_START, {"ws": week_start})
         else:
-            primary_stmt = primary_stmt.order_by(MenuWeek.week_start.desc().nullslast(), MenuWeek.created_at.desc())
-
-        result = await self.session.execute(primary_stmt.limit(1))
+            result = await self.session.execute(_LATEST_WEEK)
         week = result.scalar_one_or_none()
         if week or not fallback:
             return week
 
-        fallback_stmt = (
-            select(MenuWeek)
-            .where(MenuWeek.is_current.is_(True))
-            .order_by(MenuWeek.updated_at.desc(), MenuWeek.created_at.desc())
-        )
-        fallback = (await self.session.execute(fallback_stmt.limit(1))).scalar_one_or_none()
-        if fallback:
-            return fallback
+        current = (await self.session.execute(_CURRENT_FALLBACK)).scalar_one_or_none()
+        if current:
+            return current
 
-        latest_stmt = select(MenuWeek).order_by(MenuWeek.week_start.desc().nullslast(), MenuWeek.created_at.desc())
-        return (await self.session.execute(latest_stmt.limit(1))).scalar_one_or_none()
+        return (await self.session.execute(_LATEST_WEEK)).scalar_one_or_none()
 
     async def get_or_create_current_week(self) -> MenuWeek:
-        today = datetime.now().date()
-        week = await self.get_week(week_start=_week_start(today))
+        today = date.today()
+        week_start = _week_start(today)
+        week = await self.get_week(week_start=week_start)
         if week is None:
-            week = MenuWeek(week_label=today.strftime("%d.%m.%Y"), week_start=_week_start(today))
+            week = MenuWeek(week_label=today.strftime("%d.%m.%Y"), week_start=week_start)
             self.session.add(week)
             await self.session.flush()
         return week
@@ -92,44 +108,69 @@ class MenuService:
         week_label = week.week_label
         week_start = week.week_start
         week_day_photos = dict(week.day_photos or {})
-        stmt = select(MenuItem).where(MenuItem.week_id == week.id).order_by(MenuItem.day_of_week, MenuItem.position)
+        stmt = (
+            select(MenuItem.day_of_week, MenuItem.title)
+            .where(MenuItem.week_id == week.id)
+            .order_by(MenuItem.day_of_week, MenuItem.position)
+        )
         rows = await self.session.execute(stmt)
         items_by_day: dict[str, list[str]] = {day.value: [] for day in DayOfWeek}
-        for item in rows.scalars():
-            items_by_day.setdefault(item.day_of_week.value, []).append(item.title)
+        for day_of_week, title in rows:
+            items_by_day[day_of_week.value].append(title)
 
-        offers_stmt = select(DayOffer).where(DayOffer.week_id == week.id)
         offers_map: dict[str, DayOffer] = {}
-        try:
-            offers_result = await self.session.execute(offers_stmt)
-        except (ProgrammingError, OperationalError) as error:
-            logger.warning("Day offers unavailable, falling back to defaults: %s", error)
-            await self.session.rollback()
-        else:
-            offers_map = {offer.day_of_week.value: offer for offer in offers_result.scalars()}
+        if await self._day_offers_available():
+            offers_stmt = select(DayOffer).where(DayOffer.week_id == week.id)
+            try:
+                offers_result = await self.session.execute(offers_stmt)
+            except (ProgrammingError, OperationalError) as error:
+                logger.warning("Day offers unavailable, falling back to defaults: %s", error)
+                await self.session.rollback()
+            else:
+                offers_map = {offer.day_of_week.value: offer for offer in offers_result.scalars()}
 
-        ordered_days: Iterable[str] = items_by_day.keys()
+        default_price = settings.order_price_lari * 100
         days_payload: list[MenuDay] = []
-        for day in ordered_days:
+        for day, dishes in items_by_day.items():
             offer = offers_map.get(day)
-            allergens = list(offer.allergens or []) if offer and offer.allergens else []
+            if offer is None:
+                days_payload.append(
+                    MenuDay(
+                        name=day,
+                        dishes=dishes,
+                        photo_url=week_day_photos.get(day),
+                        offer_id=None,
+                        status=DayOfferStatus.AVAILABLE,
+                        price_amount=default_price,
+                        price_currency="GEL",
+                        calories=None,
+                        allergens=[],
+                        portion_limit=None,
+                        portions_reserved=0,
+                        portions_available=None,
+                        badge=None,
+                        order_deadline=None,
+                        notes=None,
+                    )
+                )
+                continue
             days_payload.append(
                 MenuDay(
                     name=day,
-                    dishes=list(items_by_day.get(day, [])),
+                    dishes=dishes,
                     photo_url=_resolve_photo(day, offer, week_day_photos),
-                    offer_id=offer.id if offer else None,
-                    status=offer.status if offer else DayOfferStatus.AVAILABLE,
-                    price_amount=offer.price_amount if offer else settings.order_price_lari * 100,
-                    price_currency=offer.price_currency if offer else "GEL",
-                    calories=offer.calories if offer else None,
-                    allergens=allergens,
-                    portion_limit=offer.portion_limit if offer else None,
-                    portions_reserved=offer.portions_reserved if offer else 0,
+                    offer_id=offer.id,
+                    status=offer.status,
+                    price_amount=offer.price_amount,
+                    price_currency=offer.price_currency,
+                    calories=offer.calories,
+                    allergens=list(offer.allergens or []),
+                    portion_limit=offer.portion_limit,
+                    portions_reserved=offer.portions_reserved,
                     portions_available=_portions_available(offer),
-                    badge=offer.badge if offer else None,
-                    order_deadline=offer.order_deadline if offer else None,
-                    notes=offer.notes if offer else None,
+                    badge=offer.badge,
+                    order_deadline=offer.order_deadline,
+                    notes=offer.notes,
                 )
             )
 
@@ -139,6 +180,20 @@ class MenuService:
             days=days_payload,
         )
 
+    async def _day_offers_available(self) -> bool:
+        global _day_offers_table_exists, _day_offers_checked_at
+        if _day_offers_table_exists:
+            return True
+        now = time.monotonic()
+        checked_at = _day_offers_checked_at
+        if checked_at is None or now - checked_at >= _DAY_OFFERS_RECHECK_SECONDS:
+            connection = await self.session.connection()
+            _day_offers_table_exists = await connection.run_sync(
+                lambda sync_conn: inspect(sync_conn).has_table(DayOffer.__tablename__)
+            )
+            _day_offers_checked_at = now
+        return _day_offers_table_exists
+
     async def set_week_label(self, week: MenuWeek, title: str) -> MenuWeek:
         week.week_label = title
         await self.session.flush()
@@ -161,6 +216,10 @@ class MenuService:
             await self.session.delete(existing[idx])
 
         await self.session.flush()
+        if self.redis and week.week_start:
+            # Deleting now would let a concurrent order re-cache the old titles before commit.
+            cache_key = menu_items_cache_key(week.week_start, day)
+            run_after_commit(self.session, partial(self.redis.delete, cache_key))
         return week
 
     async def set_day_photo(self, week: MenuWeek, *, day: DayOfWeek, url: str) -> MenuWeek:
@@ -170,16 +229,25 @@ class MenuService:
         await self.session.flush()
         return week
 
-    async def list_weeks(self, *, limit: int | None = None) -> list[MenuWeek]:
-        stmt = select(MenuWeek).order_by(MenuWeek.week_start.desc().nullslast(), MenuWeek.created_at.desc())
+    async def list_weeks(self, *, limit: int | None = None) -> Sequence[MenuWeek]:
+        # Summary rows only: skip hydrating the day_photos JSON blob.
+        stmt = (
+            select(MenuWeek)
+            .options(load_only(MenuWeek.week_label, MenuWeek.week_start, MenuWeek.is_current, MenuWeek.created_at))
+            .order_by(MenuWeek.week_start.desc().nullslast(), MenuWeek.created_at.desc())
+        )
         if limit:
             stmt = stmt.limit(limit)
-        rows = await self.session.execute(stmt)
-        return list(rows.scalars())
+        rows = await self.session.scalars(stmt)
+        return rows.all()
+
+
+def menu_items_cache_key(week_start: date, day: DayOfWeek) -> str:
+    return f"{settings.menu_cache_prefix}:items:{week_start.isoformat()}:{day.value}"
 
 
 def _week_start(target_date: date) -> date:
-    return target_date - timedelta(days=target_date.weekday())
+    return date.fromordinal(target_date.toordinal() - target_date.weekday())
 
 
 def _resolve_photo(day: str, offer: DayOffer | None, day_photos: dict[str, str] | None) -> str | None:
@@ -197,5 +265,5 @@ def _portions_available(offer: DayOffer | None) -> int | None:
     return available if available >= 0 else 0
 
 
-__all__ = ["MenuService", "MenuDay"]
+__all__ = ["MenuService", "MenuDay", "menu_items_cache_key"]
 logger = logging.getLogger(__name__)
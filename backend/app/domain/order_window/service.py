@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.order_window import OrderWindow
@@ -16,7 +16,16 @@ DAY_TO_INDEX = {
     "Пятница": 4,
 }
 
+# Folded spellings, consulted only when the canonical lookup misses.
+_DAY_TO_INDEX_FOLDED = {name.lower(): idx for name, idx in DAY_TO_INDEX.items()}
+_DAY_NAMES = tuple(DAY_TO_INDEX)
+
 ORDER_CUTOFF_HOUR = 10
+_CUTOFF_LABEL = f"{ORDER_CUTOFF_HOUR:02d}:00"
+
+# The window row is read several times per request; keep it on the session.
+_SESSION_CACHE_KEY = "order_window"
+_WINDOW_STMT = select(OrderWindow).limit(1)
 
 
 @dataclass(slots=True)
@@ -32,12 +41,21 @@ class OrderWindowService:
         self.session = session
 
     async def get_window(self) -> OrderWindow:
-        result = await self.session.execute(select(OrderWindow).limit(1))
+        cached: OrderWindow | None = self.session.info.get(_SESSION_CACHE_KEY)
+        if cached is not None:
+            # A row created in a rolled-back transaction is transient again, not stale.
+            state = inspect(cached)
+            if state.persistent and not state.expired_attributes:
+                return cached
+            del self.session.info[_SESSION_CACHE_KEY]
+
+        result = await self.session.execute(_WINDOW_STMT)
         window = result.scalar_one_or_none()
         if window is None:
             window = OrderWindow(next_week_enabled=False, week_start=None)
             self.session.add(window)
             await self.session.flush()
+        self.session.info[_SESSION_CACHE_KEY] = window
         return window
 
     async def set_window(self, *, enabled: bool, week_start: date | None) -> OrderWindow:
@@ -50,7 +68,10 @@ class OrderWindowService:
     async def evaluate_day(self, day: str, now: datetime | None = None) -> DayAvailability:
         idx = DAY_TO_INDEX.get(day)
         if idx is None:
-            raise ValueError(f"unknown day: {day}")
+            idx = _DAY_TO_INDEX_FOLDED.get(day.strip().lower())
+            if idx is None:
+                raise ValueError(f"unknown day: {day}")
+            day = _DAY_NAMES[idx]
 
         now = now or datetime.now()
         today_idx = now.weekday()
@@ -67,8 +88,6 @@ class OrderWindowService:
             next_week_enabled = False
             await self.session.flush()
 
-        current_week_start = _current_week_start(now)
-
         if idx < today_idx:
             if next_week_enabled and week_start_date:
                 return DayAvailability(True, None, True, week_start_date)
@@ -76,27 +95,32 @@ class OrderWindowService:
                 f"Заказы на {day} уже закрыты для текущей недели. "
                 "День снова станет доступен после обновления меню."
             )
-            return DayAvailability(False, warning, False, current_week_start)
+            return _closed(warning, now)
 
         if idx == today_idx and now.hour >= ORDER_CUTOFF_HOUR:
             warning = (
-                f"Заказы на {day} принимаются до {ORDER_CUTOFF_HOUR:02d}:00 этого дня. "
+                f"Заказы на {day} принимаются до {_CUTOFF_LABEL} этого дня. "
                 "Пожалуйста, выберите другой день."
             )
-            return DayAvailability(False, warning, False, current_week_start)
+            return _closed(warning, now)
 
         if next_week_enabled and week_start_date:
             target_week = week_start_date
             is_next_week = today_date < week_start_date
         else:
-            target_week = current_week_start
+            target_week = _current_week_start(now)
             is_next_week = False
 
         return DayAvailability(True, None, is_next_week, target_week)
 
 
 def _current_week_start(now: datetime) -> date:
-    return (now - timedelta(days=now.weekday())).date()
+    # Monday as a single ordinal subtraction; no intermediate datetime/timedelta.
+    return date.fromordinal(now.toordinal() - now.weekday())
+
+
+def _closed(warning: str, now: datetime) -> DayAvailability:
+    return DayAvailability(False, warning, False, _current_week_start(now))
 
 
 __all__ = ["OrderWindowService", "DayAvailability", "ORDER_CUTOFF_HOUR", "DAY_TO_INDEX"]
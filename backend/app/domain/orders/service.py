@@ -1,25 +1,33 @@
 from __future__ import annotations
 
-import secrets
+import asyncio
+import json
+import os
+import random
+import re
 import time
 import uuid
 from collections import Counter
+from collections.abc import AsyncIterator, Callable, Sequence
 from dataclasses import dataclass
 from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Literal
 
 from redis.asyncio import Redis
-from sqlalchemy import and_, select
+from sqlalchemy import and_, bindparam, insert, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, raiseload
 
 from app.core.config import settings
 from app.db.models.enums import DayOfferStatus, DayOfWeek, OrderStatus, UserRole
 from app.db.models.menu import DayOffer, MenuItem, MenuWeek
-from app.db.models.order import Order
+from app.db.models.order import ACTIVE_ORDER_PREDICATE, Order
 from app.db.models.order_template import OrderTemplate, OrderTemplateWeek
 from app.db.models.user import User
 
-from ..menu import MenuService
+from ..menu import MenuService, menu_items_cache_key
 from ..order_window import DayAvailability, OrderWindowService
 from .errors import (
     DuplicateOrderError,
@@ -29,7 +37,63 @@ from .errors import (
     ValidationError,
 )
 
-_ACTIVE_STATUSES = {OrderStatus.NEW, OrderStatus.CONFIRMED}
+_ACTIVE_STATUSES_TUPLE = (OrderStatus.NEW, OrderStatus.CONFIRMED)
+_ACTIVE_STATUSES = frozenset(_ACTIVE_STATUSES_TUPLE)
+
+_BASE36_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Two-digit lookup so _base36 peels 36**2 per step.
+_BASE36_PAIRS = tuple(high + low for high in _BASE36_ALPHABET for low in _BASE36_ALPHABET)
+# The user segment of an order id keeps the last four base36 digits of the user key.
+_POW36_4 = 36**4
+# The random id segment only disambiguates display ids, so a per-process PRNG seeded
+# from the OS is enough and keeps syscalls off the order path.
+_ORDER_RNG = random.Random(os.urandom(16))
+
+# Hot-path statements are built once; SQLAlchemy reuses their compiled form.
+_WEEK_MENU_FOR_DAY = (
+    # One round-trip for both the published week and its dishes for the day.
+    select(MenuWeek.id, MenuItem.title)
+    .outerjoin(
+        MenuItem,
+        and_(MenuItem.week_id == MenuWeek.id, MenuItem.day_of_week == bindparam("day")),
+    )
+    .where(MenuWeek.week_start == bindparam("week_start"))
+    .order_by(MenuItem.position)
+)
+_ACTIVE_DUPLICATE = (
+    select(Order)
+    .where(
+        and_(
+            Order.user_id == bindparam("user_id"),
+            Order.day_of_week == bindparam("day"),
+            Order.delivery_week_start == bindparam("week_start"),
+            Order.status.in_(_ACTIVE_STATUSES_TUPLE),
+        )
+    )
+    .order_by(Order.created_at.desc())
+)
+# Order lists are serialized from their own columns only; any relationship access
+# would be a per-row lazy load, so make it fail loudly instead.
+_ORDERS_FOR_USER = (
+    select(Order)
+    .options(raiseload("*"))
+    .where(Order.user_id == bindparam("user_id"))
+    .order_by(Order.created_at.desc())
+    .limit(bindparam("limit"))
+    .offset(bindparam("offset"))
+)
+_ORDERS_FOR_WEEK = (
+    select(Order)
+    .options(raiseload("*"))
+    .where(Order.delivery_week_start == bindparam("week_start"))
+    .order_by(Order.day_of_week, Order.created_at)
+    .execution_options(yield_per=200)
+)
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
 
 
 @dataclass(slots=True)
@@ -118,9 +182,25 @@ class PlannerCheckoutResult:
     weeks: list[PlannerCheckoutWeek]
 
 
-_PROMO_CODES: dict[str, dict[str, int | str]] = {
-    "WELCOME10": {"type": "percent", "value": 10, "min_subtotal": 3000},
-    "TRYWEEK": {"type": "flat", "value": 1500, "min_subtotal": 1500},
+_DAY_OFFSETS: dict[DayOfWeek, int] = {
+    DayOfWeek.MONDAY: 0,
+    DayOfWeek.TUESDAY: 1,
+    DayOfWeek.WEDNESDAY: 2,
+    DayOfWeek.THURSDAY: 3,
+    DayOfWeek.FRIDAY: 4,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _PromoRule:
+    type: Literal["percent", "flat"]
+    value: int
+    min_subtotal: int = 0
+
+
+_PROMO_CODES: dict[str, _PromoRule] = {
+    "WELCOME10": _PromoRule(type="percent", value=10, min_subtotal=3000),
+    "TRYWEEK": _PromoRule(type="flat", value=1500, min_subtotal=1500),
 }
 
 _DELIVERY_ZONES: dict[str, tuple[str, ...]] = {
@@ -141,6 +221,10 @@ _DELIVERY_ZONES: dict[str, tuple[str, ...]] = {
         "sunny beach",
     ),
 }
+# One precompiled alternation per zone scans the address once per zone, in priority order.
+_ZONE_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = tuple(
+    (zone, re.compile("|".join(map(re.escape, keywords)))) for zone, keywords in _DELIVERY_ZONES.items()
+)
 
 
 class OrderService:
@@ -161,44 +245,36 @@ class OrderService:
         if not self.redis:
             return
         key = f"{settings.orders_rate_limit_redis_key_prefix}:{user.id}"
-        ttl = await self.redis.ttl(key)
-        if ttl and ttl > 0:
+        # SET NX EX claims the window atomically; a falsy reply means it is still open.
+        acquired = await self.redis.set(key, "1", ex=settings.order_rate_limit_window_seconds, nx=True)
+        if not acquired:
             raise ValidationError(
                 field="rate_limit",
                 message="Слишком часто: подождите перед следующим заказом",
             )
-        await self.redis.set(key, "1", ex=settings.order_rate_limit_window_seconds)
 
-    async def _ensure_menu(self, *, day: DayOfWeek, target_week_start: date) -> tuple[MenuWeek, list[str]]:
-        week = await self.menu_service.get_week(week_start=target_week_start, fallback=False)
-        if not week:
+    async def _ensure_menu(self, *, day: DayOfWeek, target_week_start: date) -> list[str]:
+        cache_key = menu_items_cache_key(target_week_start, day)
+        if self.redis:
+            cached = await self.redis.get(cache_key)
+            if cached:
+                return json.loads(cached)
+
+        params = {"week_start": target_week_start, "day": day}
+        rows = (await self.session.execute(_WEEK_MENU_FOR_DAY, params)).all()
+        if not rows:
             raise ValidationError(field="day", message="Меню для выбранной недели не опубликовано")
 
-        stmt = (
-            select(MenuItem)
-            .where(and_(MenuItem.week_id == week.id, MenuItem.day_of_week == day))
-            .order_by(MenuItem.position)
-        )
-        rows = await self.session.execute(stmt)
-        items = [row.title for row in rows.scalars()]
+        items = [title for _, title in rows if title is not None]
         if not items:
             raise ValidationError(field="day", message="Меню на выбранный день не заполнено")
-        return week, items
+        if self.redis:
+            await self.redis.set(cache_key, json.dumps(items, ensure_ascii=False), ex=settings.menu_cache_ttl_seconds)
+        return items
 
     async def _find_duplicate(self, *, user: User, day: DayOfWeek, target_week_start: date) -> Order | None:
-        stmt = (
-            select(Order)
-            .where(
-                and_(
-                    Order.user_id == user.id,
-                    Order.day_of_week == day,
-                    Order.delivery_week_start == target_week_start,
-                    Order.status.in_(list(_ACTIVE_STATUSES)),
-                )
-            )
-            .order_by(Order.created_at.desc())
-        )
-        result = await self.session.execute(stmt)
+        params = {"user_id": user.id, "day": day, "week_start": target_week_start}
+        result = await self.session.execute(_ACTIVE_DUPLICATE, params)
         return result.scalar_one_or_none()
 
     async def create_order(self, *, user: User, draft: OrderDraft) -> Order:
@@ -207,43 +283,62 @@ class OrderService:
                 field="count",
                 message=f"Количество должно быть от 1 до {settings.order_daily_limit}",
             )
-        if not draft.address.strip():
+        address = draft.address.strip()
+        if not address:
             raise ValidationError(field="address", message="Адрес доставки обязателен")
 
-        await self._rate_limit(user=user)
-
-        availability: DayAvailability = await self.window_service.evaluate_day(draft.day.value)
+        # The Redis rate-limit claim and the window lookup use separate connections;
+        # overlap them, but still surface a rate-limit rejection first.
+        rate_limit = asyncio.create_task(self._rate_limit(user=user))
+        try:
+            availability: DayAvailability = await self.window_service.evaluate_day(draft.day.value)
+        except BaseException:
+            # Keep the lookup's own error; drain the task so its outcome is not logged.
+            rate_limit.cancel()
+            await asyncio.gather(rate_limit, return_exceptions=True)
+            raise
+        await rate_limit
         if not availability.allowed:
             raise OrderWindowClosedError(availability.warning or "День недоступен")
 
-        _, menu_items = await self._ensure_menu(day=draft.day, target_week_start=availability.target_week_start)
+        menu_items = await self._ensure_menu(day=draft.day, target_week_start=availability.target_week_start)
 
-        duplicate = await self._find_duplicate(user=user, day=draft.day, target_week_start=availability.target_week_start)
-        if duplicate:
-            raise DuplicateOrderError(
-                existing_order_id=duplicate.id,
-                existing_count=duplicate.count,
-                day=draft.day.value,
+        delivery_date = availability.target_week_start + timedelta(days=_day_offset(draft.day))
+        stmt = (
+            _upsert_insert(self.session)(Order)
+            .values(
+                id=_generate_order_id(user.id),
+                user_id=user.id,
+                day_of_week=draft.day,
+                count=draft.count,
+                menu_items=menu_items,
+                status=OrderStatus.NEW,
+                address=address,
+                phone=draft.phone,
+                delivery_week_start=availability.target_week_start,
+                delivery_date=delivery_date,
+                next_week=availability.is_next_week,
+                unit_price=settings.order_price_lari,
             )
+            .on_conflict_do_nothing(
+                index_elements=[Order.user_id, Order.day_of_week, Order.delivery_week_start],
+                index_where=text(ACTIVE_ORDER_PREDICATE),
+            )
+            .returning(Order)
+        )
+        order = (await self.session.scalars(stmt)).one_or_none()
+        if order is not None:
+            return order
 
-        delivery_date = availability.target_week_start + timedelta(days=_day_offset(draft.day))
-        order = Order(
-            id=_generate_order_id(user.id),
-            user_id=user.id,
-            day_of_week=draft.day,
-            count=draft.count,
-            menu_items=menu_items,
-            status=OrderStatus.NEW,
-            address=draft.address.strip(),
-            phone=draft.phone,
-            delivery_week_start=availability.target_week_start,
-            delivery_date=delivery_date,
-            next_week=availability.is_next_week,
-            unit_price=settings.order_price_lari,
+        # The partial unique index rejected the insert: report the active order it collided with.
+        duplicate = await self._find_duplicate(user=user, day=draft.day, target_week_start=availability.target_week_start)
+        if duplicate is None:
+            raise ValidationError(field="day", message="Не удалось оформить заказ, попробуйте ещё раз")
+        raise DuplicateOrderError(
+            existing_order_id=duplicate.id,
+            existing_count=duplicate.count,
+            day=draft.day.value,
         )
-        self.session.add(order)
-        await self.session.flush()
-        return order
 
     async def calculate_planner_quote(
         self,
@@ -304,41 +399,40 @@ class OrderService:
         self.session.add(template)
         await self.session.flush()
 
-        for index, (request, week_quote) in enumerate(zip(week_requests, quote.weeks)):
-            selections_payload = [
-                {"offerId": str(selection.offer_id), "portions": selection.portions}
-                for selection in request.selections
-            ]
-            items_payload = [
-                {
-                    "offerId": str(item.offer_id),
-                    "day": item.day,
-                    "status": item.status,
-                    "requestedPortions": item.requested_portions,
-                    "acceptedPortions": item.accepted_portions,
-                    "unitPrice": item.unit_price,
-                    "currency": item.currency,
-                    "subtotal": item.subtotal,
-                    "message": item.message,
-                }
-                for item in week_quote.items
-            ]
-            week_row = OrderTemplateWeek(
-                template_id=template.id,
-                week_index=index,
-                week_start=request.week_start,
-                enabled=week_quote.enabled,
-                menu_status=week_quote.menu_status,
-                label=week_quote.week_label,
-                subtotal=week_quote.subtotal,
-                currency=week_quote.currency,
-                selections=selections_payload,
-                items=items_payload,
-                warnings=week_quote.warnings,
-            )
-            self.session.add(week_row)
-
-        await self.session.flush()
+        week_rows = [
+            {
+                "template_id": template.id,
+                "week_index": index,
+                "week_start": request.week_start,
+                "enabled": week_quote.enabled,
+                "menu_status": week_quote.menu_status,
+                "label": week_quote.week_label,
+                "subtotal": week_quote.subtotal,
+                "currency": week_quote.currency,
+                "selections": [
+                    {"offerId": str(selection.offer_id), "portions": selection.portions}
+                    for selection in request.selections
+                ],
+                "items": [
+                    {
+                        "offerId": str(item.offer_id),
+                        "day": item.day,
+                        "status": item.status,
+                        "requestedPortions": item.requested_portions,
+                        "acceptedPortions": item.accepted_portions,
+                        "unitPrice": item.unit_price,
+                        "currency": item.currency,
+                        "subtotal": item.subtotal,
+                        "message": item.message,
+                    }
+                    for item in week_quote.items
+                ],
+                "warnings": week_quote.warnings,
+            }
+            for index, (request, week_quote) in enumerate(zip(week_requests, quote.weeks))
+        ]
+        if week_rows:
+            await self.session.execute(insert(OrderTemplateWeek), week_rows)
 
         weeks_summary = [
             PlannerCheckoutWeek(
@@ -371,15 +465,9 @@ class OrderService:
         selections: list[PlannerSelection],
         weeks: list[PlannerWeekRequest] | None,
     ) -> list[PlannerWeekRequest]:
+        # The endpoints build these requests fresh per call and nothing here mutates them.
         if weeks:
-            return [
-                PlannerWeekRequest(
-                    week_start=week.week_start,
-                    selections=list(week.selections),
-                    enabled=week.enabled,
-                )
-                for week in weeks
-            ]
+            return weeks
         return [PlannerWeekRequest(week_start=None, selections=selections, enabled=True)]
 
     async def _build_planner_quote(
@@ -394,30 +482,40 @@ class OrderService:
 
         week_quotes = await self._calculate_multi_week_quotes(week_requests)
 
-        subtotal = sum(week.subtotal for week in week_quotes if week.enabled)
+        # Subtotal, warnings, primary week and currency in a single pass over the weeks.
+        subtotal = 0
+        warnings: list[str] = []
+        primary_week: PlannerWeekQuote | None = None
+        currency: str | None = None
+        for week in week_quotes:
+            if week.enabled:
+                subtotal += week.subtotal
+                if primary_week is None:
+                    primary_week = week
+            if currency is None and week.currency:
+                currency = week.currency
+            warnings.extend(week.warnings)
+        if primary_week is None and week_quotes:
+            primary_week = week_quotes[0]
+
         discount, applied_code, promo_error = _apply_promo_code(subtotal, promo_code)
         total = max(subtotal - discount, 0)
 
         zone, delivery_available, zone_message = _detect_zone(address)
 
-        warnings: list[str] = []
-        for week in week_quotes:
-            warnings.extend(week.warnings)
         if promo_error:
             warnings.append(promo_error)
         if zone_message:
             warnings.append(zone_message)
 
-        primary_week = _resolve_primary_week(week_quotes)
         items = primary_week.items if primary_week else []
-        currency = _resolve_currency(week_quotes)
 
         return PlannerQuote(
             items=items,
             subtotal=subtotal,
             discount=discount,
             total=total,
-            currency=currency,
+            currency=currency or "GEL",
             warnings=warnings,
             promo_code=applied_code,
             promo_code_error=promo_error,
@@ -430,45 +528,43 @@ class OrderService:
         if not requests:
             return []
 
-        offer_ids: set[uuid.UUID] = set()
-        for request in requests:
-            if not request.enabled:
-                continue
-            for selection in request.selections:
-                if selection.portions > 0:
-                    offer_ids.add(selection.offer_id)
-
-        offers: dict[uuid.UUID, DayOffer] = {}
-        if offer_ids:
-            stmt = select(DayOffer).options(selectinload(DayOffer.week)).where(DayOffer.id.in_(offer_ids))
-            offers_result = await self.session.execute(stmt)
-            offers = {offer.id: offer for offer in offers_result.scalars()}
+        # Aggregate each week once; the union of keys drives the single offers query.
+        aggregated = [_aggregate_selections(request) for request in requests]
+        offer_ids = {offer_id for counts in aggregated for offer_id in counts}
 
         week_starts = {request.week_start for request in requests if request.week_start}
+        offers: dict[uuid.UUID, DayOffer] = {}
         weeks_map: dict[date, MenuWeek] = {}
-        if week_starts:
-            stmt_weeks = select(MenuWeek).where(MenuWeek.week_start.in_(week_starts))
-            weeks_result = await self.session.execute(stmt_weeks)
-            weeks_map = {week.week_start: week for week in weeks_result.scalars() if week.week_start}
-
-        quotes: list[PlannerWeekQuote] = []
-        for request in requests:
-            quotes.append(_build_week_quote(request, offers, weeks_map))
-        return quotes
-
-    async def list_orders_for_user(self, *, user: User) -> list[Order]:
-        stmt = select(Order).where(Order.user_id == user.id).order_by(Order.created_at.desc())
-        rows = await self.session.execute(stmt)
-        return list(rows.scalars())
-
-    async def list_orders_for_week(self, *, week_start: date) -> list[Order]:
-        stmt = (
-            select(Order)
-            .where(Order.delivery_week_start == week_start)
-            .order_by(Order.day_of_week, Order.created_at)
-        )
-        rows = await self.session.execute(stmt)
-        return list(rows.scalars())
+        if offer_ids or week_starts:
+            # One pass returns the requested weeks plus the weeks owning the selected offers;
+            # weeks without a selected offer come back with a NULL offer.
+            stmt = (
+                select(MenuWeek, DayOffer)
+                .outerjoin(DayOffer, and_(DayOffer.week_id == MenuWeek.id, DayOffer.id.in_(offer_ids)))
+                .where(or_(MenuWeek.week_start.in_(week_starts), DayOffer.id.is_not(None)))
+                .options(contains_eager(DayOffer.week))
+            )
+            for week, offer in await self.session.execute(stmt):
+                if offer is not None:
+                    offers[offer.id] = offer
+                if week.week_start in week_starts:
+                    weeks_map[week.week_start] = week
+
+        return [
+            _build_week_quote(request, counts, offers, weeks_map)
+            for request, counts in zip(requests, aggregated)
+        ]
+
+    async def list_orders_for_user(self, *, user: User, limit: int = 50, offset: int = 0) -> Sequence[Order]:
+        params = {"user_id": user.id, "limit": limit, "offset": offset}
+        rows = await self.session.scalars(_ORDERS_FOR_USER, params)
+        return rows.all()
+
+    async def stream_orders_for_week(self, *, week_start: date) -> AsyncIterator[Order]:
+        # A whole week can be hundreds of rows; fetch them in yield_per batches.
+        rows = await self.session.stream_scalars(_ORDERS_FOR_WEEK, {"week_start": week_start})
+        async for order in rows:
+            yield order
 
     async def update_order_count(self, *, order_id: str, new_count: int, actor: User) -> Order:
         order = await self.session.get(Order, order_id)
@@ -497,8 +593,18 @@ class OrderService:
         return order
 
 
+def _aggregate_selections(request: PlannerWeekRequest) -> Counter[uuid.UUID]:
+    aggregated: Counter[uuid.UUID] = Counter()
+    if request.enabled:
+        for selection in request.selections:
+            if selection.portions > 0:
+                aggregated[selection.offer_id] += selection.portions
+    return aggregated
+
+
 def _build_week_quote(
     request: PlannerWeekRequest,
+    aggregated: Counter[uuid.UUID],
     offers: dict[uuid.UUID, DayOffer],
     weeks_map: dict[date, MenuWeek],
 ) -> PlannerWeekQuote:
@@ -516,11 +622,6 @@ def _build_week_quote(
             warnings=[],
         )
 
-    aggregated: Counter[uuid.UUID] = Counter()
-    for selection in request.selections:
-        if selection.portions > 0:
-            aggregated[selection.offer_id] += selection.portions
-
     has_menu_row = request.week_start is not None and request.week_start in weeks_map
     is_pending_menu = request.week_start is not None and not has_menu_row
 
@@ -657,18 +758,8 @@ def _build_week_quote(
     )
 
 
-def _resolve_primary_week(weeks: list[PlannerWeekQuote]) -> PlannerWeekQuote | None:
-    for week in weeks:
-        if week.enabled:
-            return week
-    return weeks[0] if weeks else None
-
-
-def _resolve_currency(weeks: list[PlannerWeekQuote]) -> str:
-    for week in weeks:
-        if week.currency:
-            return week.currency
-    return "GEL"
+def _upsert_insert(session: AsyncSession) -> Callable[..., Any]:
+    return _UPSERT_INSERTS[session.get_bind().dialect.name]
 
 
 def _resolve_week_label(week_start: date | None, weeks_map: dict[date, MenuWeek]) -> str | None:
@@ -683,7 +774,7 @@ def _resolve_week_label(week_start: date | None, weeks_map: dict[date, MenuWeek]
 def _format_week_label(week_start: date | None) -> str | None:
     if not week_start:
         return None
-    return week_start.strftime("%d.%m.%Y")
+    return f"{week_start.day:02d}.{week_start.month:02d}.{week_start.year:04d}"
 
 
 def _generate_order_id(user_pk: uuid.UUID | str | int) -> str:
@@ -692,45 +783,63 @@ def _generate_order_id(user_pk: uuid.UUID | str | int) -> str:
     else:
         user_val = int(user_pk)
     timestamp = _base36(int(time.time()))
-    uid36 = _base36(abs(user_val))[-4:].rjust(4, "0")
-    rnd = _base36(secrets.randbits(20)).rjust(4, "0")[:4]
+    uid36 = _base36_4(abs(user_val) % _POW36_4)
+    rnd = _base36_4(_ORDER_RNG.getrandbits(20))
     return f"BLB-{timestamp}-{uid36}-{rnd}"
 
 
 def _base36(value: int) -> str:
-    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     if value == 0:
         return "0"
     neg = value < 0
     value = abs(value)
-    result = []
+    pairs = []
     while value:
-        value, digit = divmod(value, 36)
-        result.append(alphabet[digit])
-    if neg:
-        result.append("-")
-    return "".join(reversed(result))
+        value, pair = divmod(value, 1296)
+        pairs.append(_BASE36_PAIRS[pair])
+    digits = "".join(reversed(pairs)).lstrip("0")
+    return "-" + digits if neg else digits
+
+
+def _base36_4(value: int) -> str:
+    """Zero-padded four-digit base36 for ``0 <= value < 36**4``."""
+    value, d3 = divmod(value, 36)
+    value, d2 = divmod(value, 36)
+    d0, d1 = divmod(value, 36)
+    return _BASE36_ALPHABET[d0] + _BASE36_ALPHABET[d1] + _BASE36_ALPHABET[d2] + _BASE36_ALPHABET[d3]
+
+
+def _reseed_order_rng() -> None:
+    _ORDER_RNG.seed(os.urandom(16))
+
+
+# Forked workers must not replay the parent's random sequence.
+os.register_at_fork(after_in_child=_reseed_order_rng)
 
 
+# Quotes are recomputed as portions change; the same (subtotal, code) pairs recur.
+@lru_cache(maxsize=1024)
 def _apply_promo_code(subtotal: int, promo_code: str | None) -> tuple[int, str | None, str | None]:
     if not promo_code:
         return 0, None, None
 
-    normalized = promo_code.strip().upper()
+    # Codes restored from storage are already canonical; normalize only on a miss.
+    normalized = promo_code
     rule = _PROMO_CODES.get(normalized)
+    if rule is None:
+        normalized = promo_code.strip().upper()
+        rule = _PROMO_CODES.get(normalized)
     if not rule:
         return 0, None, "Промокод не найден"
 
-    min_subtotal = int(rule.get("min_subtotal", 0))
-    if subtotal < min_subtotal:
-        required_lari = min_subtotal / 100
+    if subtotal < rule.min_subtotal:
+        required_lari = rule.min_subtotal / 100
         return 0, None, f"Минимальная сумма для промокода {normalized} — {required_lari:.0f} ₾"
 
-    discount = 0
-    if rule.get("type") == "percent":
-        discount = subtotal * int(rule.get("value", 0)) // 100
+    if rule.type == "percent":
+        discount = subtotal * rule.value // 100
     else:
-        discount = int(rule.get("value", 0))
+        discount = rule.value
 
     discount = min(discount, subtotal)
     return discount, normalized, None
@@ -741,22 +850,15 @@ def _detect_zone(address: str | None) -> tuple[str | None, bool, str | None]:
         return None, False, "Укажите адрес, чтобы проверить доставку"
 
     normalized = address.lower()
-    for zone, keywords in _DELIVERY_ZONES.items():
-        if any(keyword in normalized for keyword in keywords):
+    for zone, pattern in _ZONE_PATTERNS:
+        if pattern.search(normalized):
             return zone, True, None
 
     return None, False, "Адрес пока вне зоны доставки (центр и новый бульвар)"
 
 
 def _day_offset(day: DayOfWeek) -> int:
-    mapping = {
-        DayOfWeek.MONDAY: 0,
-        DayOfWeek.TUESDAY: 1,
-        DayOfWeek.WEDNESDAY: 2,
-        DayOfWeek.THURSDAY: 3,
-        DayOfWeek.FRIDAY: 4,
-    }
-    return mapping[day]
+    return _DAY_OFFSETS[day]
 
 
 __all__ = [
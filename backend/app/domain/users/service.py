@@ -1,17 +1,50 @@
 from __future__ import annotations
 
+import asyncio
+import secrets
 import uuid
-from datetime import datetime
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import cache
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import hash_password, verify_password
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password, verify_password
 from app.db.models.enums import UserRole
 from app.db.models.user import User
 
 from .errors import InvalidCredentialsError, UserAlreadyExistsError
 
+_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Logins closer together than this do not rewrite last_login_at.
+_LAST_LOGIN_RESOLUTION = timedelta(minutes=5)
+
+
+# argon2id needs ~46 MiB per hash; a small dedicated pool caps that per process instead of
+# the default executor's min(32, cpu + 4) threads.
+_HASH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+
+
+async def _run_hashing(func: Callable[..., Any], *args: str) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_HASH_EXECUTOR, func, *args)
+
+
+@cache
+def _dummy_password_hash() -> str:
+    return hash_password(secrets.token_urlsafe(16))
+
+
+def _verify_dummy_password(password: str) -> bool:
+    # Runs in a worker thread, so building the cached hash never blocks the event loop.
+    return verify_password(password, _dummy_password_hash())
+
 
 class UserService:
     def __init__(self, session: AsyncSession) -> None:
@@ -20,23 +53,35 @@ class UserService:
     async def get_by_id(self, user_id: uuid.UUID) -> User | None:
         return await self.session.get(User, user_id)
 
+    async def get_many_by_ids(self, user_ids: Collection[uuid.UUID]) -> dict[uuid.UUID, User]:
+        if not user_ids:
+            return {}
+        result = await self.session.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars()}
+
     async def get_by_email(self, email: str) -> User | None:
-        stmt = select(User).where(User.email == email.lower())
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(_BY_EMAIL, {"email": email.lower()})
         return result.scalar_one_or_none()
 
     async def ensure_user(self, *, email: str | None, telegram_id: int | None, full_name: str | None = None) -> User:
-        if email:
-            user = await self.get_by_email(email)
-            if user:
-                return user
+        normalized_email = email.lower() if email else None
+        conditions = []
+        if normalized_email:
+            conditions.append(User.email == normalized_email)
         if telegram_id:
-            stmt = select(User).where(User.telegram_id == telegram_id)
-            result = await self.session.execute(stmt)
-            user = result.scalar_one_or_none()
-            if user:
-                return user
-        user = User(email=email.lower() if email else None, telegram_id=telegram_id, full_name=full_name)
+            conditions.append(User.telegram_id == telegram_id)
+        if conditions:
+            # ON CONFLICT takes a single arbiter, but a user may match on either unique
+            # column, with email taking precedence; one OR lookup covers both.
+            # Both columns are unique, so at most two rows come back.
+            result = await self.session.execute(select(User).where(or_(*conditions)))
+            candidates = result.scalars().all()
+            for user in candidates:
+                if normalized_email and user.email == normalized_email:
+                    return user
+            if candidates:
+                return candidates[0]
+        user = User(email=normalized_email, telegram_id=telegram_id, full_name=full_name)
         self.session.add(user)
         await self.session.flush()
         return user
@@ -63,24 +108,39 @@ class UserService:
             role=role,
             is_active=True,
         )
-        user.password_hash = hash_password(password)
+        user.password_hash = await _run_hashing(hash_password, password)
         self.session.add(user)
         await self.session.flush()
         return user
 
     async def set_password(self, user: User, password: str) -> User:
-        user.password_hash = hash_password(password)
+        user.password_hash = await _run_hashing(hash_password, password)
         await self.session.flush()
         return user
 
     async def authenticate(self, *, email: str, password: str) -> User | None:
         user = await self.get_by_email(email)
         if not user or not user.password_hash:
+            # Spend the same hashing time as a real check so response timing
+            # does not reveal which emails are registered.
+            await _run_hashing(_verify_dummy_password, password)
             return None
-        if not verify_password(password, user.password_hash):
+        # Password hashing is deliberately slow; keep it off the event loop.
+        valid, new_hash = await _run_hashing(
+            verify_and_update_password, password, user.password_hash
+        )
+        if not valid:
             return None
-        user.last_login_at = datetime.utcnow()
-        await self.session.flush()
+        if new_hash is not None:
+            # Stored with older settings (e.g. bcrypt); upgrade while the plaintext is at hand.
+            user.password_hash = new_hash
+        now = datetime.now(UTC)
+        previous = user.last_login_at
+        if previous is not None and previous.tzinfo is None:
+            previous = previous.replace(tzinfo=UTC)
+        if previous is None or now - previous > _LAST_LOGIN_RESOLUTION:
+            # Flushed together with the request's commit; no extra round-trip here.
+            user.last_login_at = now
         return user
 
     async def update_profile(
@@ -106,9 +166,11 @@ class UserService:
         return user
 
     async def change_password(self, user: User, *, current_password: str, new_password: str) -> User:
-        if not user.password_hash or not verify_password(current_password, user.password_hash):
+        if not user.password_hash or not await _run_hashing(
+            verify_password, current_password, user.password_hash
+        ):
             raise InvalidCredentialsError("invalid current password")
-        user.password_hash = hash_password(new_password)
+        user.password_hash = await _run_hashing(hash_password, new_password)
         await self.session.flush()
         return user
 
@@ -1,22 +1,42 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from redis.asyncio import Redis
 from sqlalchemy import text
 
 from .api.v1.router import router as api_router
 from .core.config import settings
 from .core.logging import configure_logging
+from .core.redis import redis_client, redis_pool
 from .db.session import engine
 
 configure_logging()
 
-_redis_client: Redis | None = Redis.from_url(str(settings.redis_url), decode_responses=True) if settings.redis_url else None
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Most handler coroutines finish without suspending; run them inline instead of
+    # bouncing each one through the ready queue.
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    yield
+    if redis_pool:
+        await redis_pool.aclose()
+
+
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 app.include_router(api_router)
 
+if settings.openapi_schema_path:
+    # The image ships the schema generated at build time; FastAPI serves a preset
+    # openapi_schema as is instead of walking every route and model.
+    app.openapi_schema = json.loads(Path(settings.openapi_schema_path).read_bytes())
+
 if settings.cors_allow_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -27,20 +47,43 @@ if settings.cors_allow_origins:
     )
 
 
-@app.get("/healthz", tags=["monitoring"])
-async def healthz() -> dict[str, str]:
-    return {"status": "ok"}
+# Liveness probes get a fixed, pre-encoded body; there is nothing to serialize.
+_HEALTHZ_BODY = b'{"status":"ok"}'
+
+
+@app.get("/healthz", tags=["monitoring"], response_class=Response)
+async def healthz() -> Response:
+    return Response(_HEALTHZ_BODY, media_type="application/json")
+
+
+# A successful readiness check is reused briefly so frequent probes do not each hit
+# Postgres and Redis.
+_READY_CACHE_SECONDS = 2.0
+_ready_checked_at: float | None = None
+
+
+async def _check_database() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_redis() -> None:
+    if redis_client:
+        await redis_client.ping()
 
 
 @app.get("/readyz", tags=["monitoring"])
 async def readyz() -> dict[str, str]:
-    try:
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
-        if _redis_client:
-            await _redis_client.ping()
-    except Exception:
+    global _ready_checked_at
+    now = asyncio.get_running_loop().time()
+    if _ready_checked_at is not None and now - _ready_checked_at < _READY_CACHE_SECONDS:
+        return {"status": "ready"}
+
+    results = await asyncio.gather(_check_database(), _check_redis(), return_exceptions=True)
+    if any(isinstance(result, Exception) for result in results):
+        _ready_checked_at = None
         return {"status": "degraded"}
+    _ready_checked_at = now
     return {"status": "ready"}
 
 
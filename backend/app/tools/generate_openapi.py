@@ -3,19 +3,15 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from fastapi.openapi.utils import get_openapi
-
 from app.main import app
 
 
 def main() -> None:
-    schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        routes=app.routes,
-    )
+    # Drop any prebuilt schema loaded at import so the routes are walked afresh.
+    app.openapi_schema = None
+    schema = app.openapi()
     output_path = Path("openapi.json")
-    output_path.write_text(json.dumps(schema, ensure_ascii=False, indent=2))
+    output_path.write_text(json.dumps(schema, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"OpenAPI schema written to {output_path.resolve()}")
 
 
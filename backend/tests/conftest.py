@@ -1,44 +1,62 @@
 from __future__ import annotations
 
-import asyncio
 from collections.abc import AsyncIterator
 from datetime import datetime
 
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.pool import StaticPool
 
 from app.db.base import Base
 
+# Unbound factory; each test binds it to its own connection.
+_session_factory = async_sessionmaker(
+    expire_on_commit=False,
+    autoflush=False,
+    join_transaction_mode="create_savepoint",
+)
 
-@pytest.fixture(scope="session")
-def event_loop() -> AsyncIterator[asyncio.AbstractEventLoop]:
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
 
-
-@pytest_asyncio.fixture()
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def async_engine() -> AsyncIterator[AsyncEngine]:
     engine = create_async_engine(
         "sqlite+aiosqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    # pysqlite defers BEGIN and never issues SAVEPOINTs inside it, so the outer
+    # transaction below would not isolate anything; take over BEGIN ourselves.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # The schema is created once for the whole test session.
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
     await engine.dispose()
 
 
-@pytest_asyncio.fixture()
+@pytest_asyncio.fixture(loop_scope="session")
 async def session(async_engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
-    factory = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
-    async with factory() as session:
-        yield session
-        await session.rollback()
+    # Each test runs inside an outer transaction that is rolled back as a whole;
+    # commit() inside a test only releases a SAVEPOINT.
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        async with _session_factory(bind=connection) as session:
+            yield session
+        await transaction.rollback()
 
 
 @pytest.fixture()
@@ -6,11 +6,15 @@ import pytest
 import pytest_asyncio
 from sqlalchemy import select
 
+from app.api.v1.endpoints.orders import list_orders
 from app.db.models.enums import DayOfferStatus, DayOfWeek, OrderStatus, UserRole
 from app.db.models.menu import DayOffer, MenuItem, MenuWeek
+from app.db.models.order import Order
+from app.db.models.order_template import OrderTemplateWeek
 from app.db.models.order_window import OrderWindow
 from app.db.models.user import User
-from app.domain.menu import MenuService
+from app.db.session import _AFTER_COMMIT_KEY
+from app.domain.menu import MenuService, menu_items_cache_key
 from app.domain.order_window import OrderWindowService
 from app.domain.orders import (
     DuplicateOrderError,
@@ -18,9 +22,27 @@ from app.domain.orders import (
     OrderService,
     PlannerSelection,
     PlannerWeekRequest,
+    ValidationError,
 )
 
 
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def set(self, key: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def delete(self, key: str) -> int:
+        return 1 if self.values.pop(key, None) is not None else 0
+
+
 @pytest_asyncio.fixture()
 async def user(session):
     instance = User(email="test@example.com", role=UserRole.CUSTOMER)
@@ -87,6 +109,138 @@ async def test_create_order_duplicate(session, user, menu_week, order_window):
         await service.create_order(user=user, draft=draft)
 
 
+@pytest.mark.asyncio
+async def test_create_order_rate_limited(session, user, menu_week, order_window):
+    menu_service = MenuService(session)
+    window_service = OrderWindowService(session)
+    service = OrderService(
+        session, menu_service=menu_service, window_service=window_service, redis=_FakeRedis()
+    )
+
+    await service.create_order(
+        user=user, draft=OrderDraft(day=DayOfWeek.FRIDAY, count=1, address="Адрес", phone=None)
+    )
+
+    with pytest.raises(ValidationError) as exc_info:
+        await service.create_order(
+            user=user, draft=OrderDraft(day=DayOfWeek.MONDAY, count=1, address="Адрес", phone=None)
+        )
+    assert exc_info.value.field == "rate_limit"
+
+
+class _BrokenWindowService(OrderWindowService):
+    async def evaluate_day(self, day, now=None):
+        raise RuntimeError("window lookup failed")
+
+
+@pytest.mark.asyncio
+async def test_create_order_window_error_wins_over_rate_limit(session, user, menu_week, order_window):
+    redis = _FakeRedis()
+    service = OrderService(
+        session,
+        menu_service=MenuService(session),
+        window_service=OrderWindowService(session),
+        redis=redis,
+    )
+    await service.create_order(
+        user=user, draft=OrderDraft(day=DayOfWeek.FRIDAY, count=1, address="Адрес", phone=None)
+    )
+
+    broken = OrderService(
+        session,
+        menu_service=MenuService(session),
+        window_service=_BrokenWindowService(session),
+        redis=redis,
+    )
+    with pytest.raises(RuntimeError, match="window lookup failed"):
+        await broken.create_order(
+            user=user, draft=OrderDraft(day=DayOfWeek.MONDAY, count=1, address="Адрес", phone=None)
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_order_caches_menu_items(session, user, menu_week, order_window):
+    redis = _FakeRedis()
+    menu_service = MenuService(session, redis=redis)
+    window_service = OrderWindowService(session)
+    service = OrderService(session, menu_service=menu_service, window_service=window_service, redis=redis)
+
+    await service.create_order(
+        user=user, draft=OrderDraft(day=DayOfWeek.FRIDAY, count=1, address="Адрес", phone=None)
+    )
+    key = menu_items_cache_key(menu_week.week_start, DayOfWeek.FRIDAY)
+    assert redis.values[key] == '["Суп дня"]'
+
+    await menu_service.upsert_day_items(menu_week, day=DayOfWeek.FRIDAY, items=["Борщ"])
+    # Invalidation waits for the commit, so concurrent readers cannot re-cache old titles.
+    assert key in redis.values
+    for callback in session.info.pop(_AFTER_COMMIT_KEY):
+        await callback()
+    assert key not in redis.values
+
+
+@pytest.mark.asyncio
+async def test_list_orders_paginates_and_streams(session, user, menu_week, order_window):
+    menu_service = MenuService(session)
+    window_service = OrderWindowService(session)
+    service = OrderService(session, menu_service=menu_service, window_service=window_service)
+
+    for day in (DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY):
+        session.add(
+            Order(
+                id=f"BLB-TEST-{day.name}",
+                user_id=user.id,
+                day_of_week=day,
+                count=1,
+                menu_items=[],
+                delivery_week_start=menu_week.week_start,
+                delivery_date=menu_week.week_start,
+            )
+        )
+    await session.flush()
+
+    first_page = await service.list_orders_for_user(user=user, limit=2)
+    second_page = await service.list_orders_for_user(user=user, limit=2, offset=2)
+
+    assert len(first_page) == 2
+    assert len(second_page) == 1
+    assert {order.id for order in [*first_page, *second_page]} == {
+        "BLB-TEST-MONDAY",
+        "BLB-TEST-TUESDAY",
+        "BLB-TEST-WEDNESDAY",
+    }
+
+    week_orders = [order async for order in service.stream_orders_for_week(week_start=menu_week.week_start)]
+    assert {order.day_of_week for order in week_orders} == {
+        DayOfWeek.MONDAY,
+        DayOfWeek.TUESDAY,
+        DayOfWeek.WEDNESDAY,
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_orders_endpoint_reports_next_page(session, user, menu_week, order_window):
+    for day in (DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY):
+        session.add(
+            Order(
+                id=f"BLB-PAGE-{day.name}",
+                user_id=user.id,
+                day_of_week=day,
+                count=1,
+                menu_items=[],
+                delivery_week_start=menu_week.week_start,
+                delivery_date=menu_week.week_start,
+            )
+        )
+    await session.flush()
+
+    first = await list_orders(mine=1, week=None, limit=2, offset=0, user=user, session=session)
+    last = await list_orders(mine=1, week=None, limit=2, offset=2, user=user, session=session)
+
+    assert (len(first.orders), first.hasMore, first.nextOffset) == (2, True, 2)
+    assert (len(last.orders), last.hasMore, last.nextOffset) == (1, False, None)
+
+
 @pytest.mark.asyncio
 async def test_calculate_planner_quote_multi_week(session, menu_week, order_window):
     menu_service = MenuService(session)
@@ -189,3 +343,47 @@ async def test_calculate_planner_quote_pending_week_freezes_price(session, menu_
     assert reserved_line.status == "reserved"
     assert reserved_line.subtotal == 2 * first_offer.price_amount
     assert reserved_line.message and "Меню уточняется" in reserved_line.message
+
+
+@pytest.mark.asyncio
+async def test_create_planner_template_persists_weeks(session, user, menu_week, order_window):
+    menu_service = MenuService(session)
+    window_service = OrderWindowService(session)
+    service = OrderService(session, menu_service=menu_service, window_service=window_service)
+
+    offer = (await session.execute(select(DayOffer).where(DayOffer.week_id == menu_week.id))).scalar_one()
+
+    assert menu_week.week_start is not None
+    weeks = [
+        PlannerWeekRequest(
+            week_start=menu_week.week_start,
+            enabled=True,
+            selections=[PlannerSelection(offer_id=offer.id, portions=2)],
+        ),
+        PlannerWeekRequest(
+            week_start=menu_week.week_start + timedelta(days=7),
+            enabled=False,
+            selections=[],
+        ),
+    ]
+
+    result = await service.create_planner_template(
+        user=user,
+        selections=[],
+        weeks=weeks,
+        address="Батуми, ул. Чавчавадзе, 5",
+    )
+
+    assert result.subtotal == 2 * offer.price_amount
+    assert result.delivery_zone == "batumi-center"
+    stored = (
+        await session.execute(
+            select(OrderTemplateWeek)
+            .where(OrderTemplateWeek.template_id == result.template_id)
+            .order_by(OrderTemplateWeek.week_index)
+        )
+    ).scalars().all()
+    assert [week.week_index for week in stored] == [0, 1]
+    assert stored[0].selections == [{"offerId": str(offer.id), "portions": 2}]
+    assert stored[0].items[0]["acceptedPortions"] == 2
+    assert stored[1].enabled is False
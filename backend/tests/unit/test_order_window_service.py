@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import inspect
+
+from app.domain.order_window import OrderWindowService
+
+
+@pytest.mark.asyncio
+async def test_get_window_reuses_row_within_session(session):
+    service = OrderWindowService(session)
+
+    window = await service.get_window()
+
+    assert await OrderWindowService(session).get_window() is window
+
+
+@pytest.mark.asyncio
+async def test_get_window_reloads_after_rollback(session):
+    service = OrderWindowService(session)
+    window = await service.get_window()
+    await session.commit()
+
+    window.next_week_enabled = True
+    await session.rollback()
+
+    reloaded = await service.get_window()
+    assert reloaded.next_week_enabled is False
+
+
+@pytest.mark.asyncio
+async def test_get_window_drops_row_created_in_rolled_back_transaction(session):
+    service = OrderWindowService(session)
+    created = await service.get_window()
+    await session.rollback()
+
+    reloaded = await service.get_window()
+
+    assert reloaded is not created
+    assert inspect(reloaded).persistent
+
+
+@pytest.mark.asyncio
+async def test_evaluate_day_accepts_folded_day_names(session):
+    service = OrderWindowService(session)
+
+    canonical = await service.evaluate_day("Пятница")
+    folded = await service.evaluate_day(" пятница ")
+
+    assert folded == canonical
+    with pytest.raises(ValueError):
+        await service.evaluate_day("Суббота")
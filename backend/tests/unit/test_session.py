@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db import session as session_module
+from app.db.session import get_session, run_after_commit
+
+
+@pytest.fixture()
+def session_factory(monkeypatch, async_engine):
+    factory = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+    monkeypatch.setattr(session_module, "async_session_factory", factory)
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_after_commit_callbacks_run_once_committed(session_factory):
+    calls: list[str] = []
+
+    async def _record() -> None:
+        calls.append("done")
+
+    async with get_session() as session:
+        run_after_commit(session, _record)
+        assert calls == []
+
+    assert calls == ["done"]
+
+
+@pytest.mark.asyncio
+async def test_after_commit_callbacks_dropped_on_rollback(session_factory):
+    calls: list[str] = []
+
+    async def _record() -> None:
+        calls.append("done")
+
+    with pytest.raises(RuntimeError):
+        async with get_session() as session:
+            run_after_commit(session, _record)
+            raise RuntimeError("boom")
+
+    assert calls == []
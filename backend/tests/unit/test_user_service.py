@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import uuid
+
 import pytest
+from passlib.context import CryptContext
 
+from app.core.security import verify_password
 from app.db.models.enums import UserRole
 from app.domain.users import InvalidCredentialsError, UserAlreadyExistsError, UserService
 
@@ -55,3 +59,61 @@ async def test_change_password_invalid_current(session):
 
     with pytest.raises(InvalidCredentialsError):
         await service.change_password(user, current_password="wrongpass", new_password="newpass123")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_unknown_email_returns_none(session):
+    service = UserService(session)
+
+    assert await service.authenticate(email="missing@example.com", password="whatever") is None
+
+
+@pytest.mark.asyncio
+async def test_authenticate_skips_recent_last_login_update(session):
+    service = UserService(session)
+    await service.create_user(email="login@example.com", password="secret123")
+
+    first = await service.authenticate(email="login@example.com", password="secret123")
+    assert first is not None and first.last_login_at is not None
+    stamped = first.last_login_at
+
+    second = await service.authenticate(email="login@example.com", password="secret123")
+    assert second is not None
+    assert second.last_login_at == stamped
+
+
+@pytest.mark.asyncio
+async def test_authenticate_upgrades_legacy_bcrypt_hash(session):
+    service = UserService(session)
+    user = await service.create_user(email="legacy@example.com", password="secret123")
+    user.password_hash = CryptContext(schemes=["bcrypt"]).hash("secret123")
+
+    assert await service.authenticate(email="legacy@example.com", password="wrong") is None
+    assert user.password_hash.startswith("$2b$")
+
+    assert await service.authenticate(email="legacy@example.com", password="secret123") is user
+    assert user.password_hash.startswith("$argon2id$")
+    assert verify_password("secret123", user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_ensure_user_prefers_email_match(session):
+    service = UserService(session)
+    by_email = await service.ensure_user(email="Bot@Example.com", telegram_id=None)
+    by_telegram = await service.ensure_user(email=None, telegram_id=424242)
+
+    assert by_email.email == "bot@example.com"
+    assert await service.ensure_user(email="bot@example.com", telegram_id=424242) is by_email
+    assert await service.ensure_user(email="other@example.com", telegram_id=424242) is by_telegram
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_ids_returns_mapping(session):
+    service = UserService(session)
+    first = await service.create_user(email="first@example.com", password="secret123")
+    second = await service.create_user(email="second@example.com", password="secret123")
+
+    users = await service.get_many_by_ids([first.id, second.id, uuid.uuid4()])
+
+    assert users == {first.id: first, second.id: second}
+    assert await service.get_many_by_ids([]) == {}
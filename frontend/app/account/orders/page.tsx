@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
 
@@ -18,14 +18,23 @@ export default function AccountOrdersPage() {
     }
   }, [isLoading, user, router]);
 
-  const { data: orders, isLoading: ordersLoading } = useQuery({
+  const {
+    data,
+    isLoading: ordersLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["orders", "mine"],
-    queryFn: () => {
+    queryFn: ({ pageParam }) => {
       if (!accessToken) throw new Error("no token");
-      return fetchMyOrders(accessToken);
+      return fetchMyOrders(accessToken, pageParam);
     },
+    initialPageParam: 0,
+    getNextPageParam: (lastPage) => (lastPage.hasMore ? lastPage.nextOffset : undefined),
     enabled: Boolean(accessToken),
   });
+  const orders = data?.pages.flatMap((page) => page.orders);
 
   if (!user || !accessToken) {
     return <p className="text-sm text-slate-600 dark:text-slate-300">Требуется авторизация…</p>;
@@ -89,6 +98,16 @@ export default function AccountOrdersPage() {
           </article>
         ))}
       </div>
+      {hasNextPage && (
+        <button
+          type="button"
+          className="btn-secondary w-fit"
+          onClick={() => fetchNextPage()}
+          disabled={isFetchingNextPage}
+        >
+          {isFetchingNextPage ? "Загружаем…" : "Показать ещё"}
+        </button>
+      )}
     </section>
   );
 }
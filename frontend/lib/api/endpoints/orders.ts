@@ -17,6 +17,8 @@ export type OrderPayload = {
 
 export type OrderListResponse = {
   orders: OrderPayload[];
+  hasMore: boolean;
+  nextOffset: number | null;
 };
 
 export type CreateOrderBody = {
@@ -135,10 +137,10 @@ export async function checkoutPlannerOrder(
   return data;
 }
 
-export async function fetchMyOrders(token: string): Promise<OrderPayload[]> {
+export async function fetchMyOrders(token: string, offset = 0): Promise<OrderListResponse> {
   const client = apiClient(token);
-  const { data } = await client.get<OrderListResponse>("/orders", { params: { mine: 1 } });
-  return data.orders;
+  const { data } = await client.get<OrderListResponse>("/orders", { params: { mine: 1, offset } });
+  return data;
 }
 
 export async function fetchOrdersForWeek(token: string, weekStart: string): Promise<OrderPayload[]> {
@@ -10,12 +10,28 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
 import sys
+import uuid
 from datetime import date, datetime, timedelta
+from logging.handlers import MemoryHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from sqlalchemy import select
+try:  # streaming parser for the large dumps; falls back to _loads without it
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:  # parses bytes directly and several times faster than the stdlib
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover - optional dependency
+    _loads = json.loads
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 ROOT = Path(__file__).resolve().parents[1]
 BACKEND_ROOT = ROOT / "backend"
@@ -23,12 +39,14 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from app.core.config import settings
+from app.core.redis import redis_client
 from app.db.models.enums import DayOfWeek, OrderStatus, UserRole
 from app.db.models.menu import MenuItem, MenuWeek
 from app.db.models.order import Order
 from app.db.models.order_window import OrderWindow
 from app.db.models.user import User
 from app.db.session import async_session_factory, engine
+from app.domain.menu import menu_items_cache_key
 
 LEGACY_DIR = Path.cwd()
 USERS_FILE = LEGACY_DIR / "users.json"
@@ -38,90 +56,226 @@ ORDER_WINDOW_FILE = LEGACY_DIR / "order_window.json"
 LOG_PATH = Path("logs/migrate_json_to_db.log")
 LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Per-row warnings on a large dump would otherwise hit the log file one write at a time;
+# records are buffered and written in chunks (errors and interpreter exit flush early).
+_file_handler = logging.FileHandler(LOG_PATH, encoding="utf-8")
+_file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(message)s",
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler(LOG_PATH, encoding="utf-8"),
+        MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=_file_handler),
     ],
 )
 logger = logging.getLogger("migrate-json")
 
+# Rows per multi-VALUES statement; keeps bind parameters well under PostgreSQL's limit.
+BATCH_SIZE = 1000
+
+
+def _insert_for(session):
+    # Both backends the script runs against support INSERT ... ON CONFLICT.
+    return pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def _iter_legacy_items(path: Path) -> Iterator[tuple[str, Any]]:
+    """Yield top-level ``(key, payload)`` pairs without holding the whole dump in memory."""
 
-async def migrate_users(session) -> dict[int, User]:
+    if ijson is None:
+        yield from _loads(path.read_bytes()).items()
+        return
+    with path.open("rb") as fh:
+        yield from ijson.kvitems(fh, "", use_float=True)
+
+
+async def _upsert_users(session, rows: list[dict[str, Any]]) -> None:
+    stmt = _insert_for(session)(User).values(rows)
+    # Blank legacy values keep whatever the account already has.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={
+            "address": func.coalesce(func.nullif(stmt.excluded.address, ""), User.address),
+            "phone": func.coalesce(func.nullif(stmt.excluded.phone, ""), User.phone),
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def migrate_users(session) -> None:
     if not USERS_FILE.exists():
         logger.warning("users.json not found — skipping user migration")
-        return {}
-    data = json.loads(USERS_FILE.read_text(encoding="utf-8"))
-    result: dict[int, User] = {}
-    for key, payload in data.items():
+        return
+    rows: dict[int, dict[str, Any]] = {}
+    total = 0
+    for key, payload in _iter_legacy_items(USERS_FILE):
         try:
             telegram_id = int(key)
         except ValueError:
             logger.warning("Skip user with invalid key: %s", key)
             continue
-        stmt = select(User).where(User.telegram_id == telegram_id)
-        existing = (await session.execute(stmt)).scalar_one_or_none()
-        address = (payload or {}).get("address")
-        phone = (payload or {}).get("phone")
-        if existing:
-            existing.address = address or existing.address
-            existing.phone = phone or existing.phone
-            result[telegram_id] = existing
-            logger.info("Updated user %s", telegram_id)
-        else:
-            user = User(telegram_id=telegram_id, address=address, phone=phone, role=UserRole.CUSTOMER)
-            session.add(user)
-            await session.flush()
-            result[telegram_id] = user
-            logger.info("Inserted user %s", telegram_id)
-    return result
+        payload = payload or {}
+        rows[telegram_id] = {
+            "telegram_id": telegram_id,
+            "address": payload.get("address"),
+            "phone": payload.get("phone"),
+            "role": UserRole.CUSTOMER,
+        }
+        if len(rows) >= BATCH_SIZE:
+            await _upsert_users(session, list(rows.values()))
+            total += len(rows)
+            rows.clear()
+    if rows:
+        await _upsert_users(session, list(rows.values()))
+        total += len(rows)
+    logger.info("Upserted %d users", total)
+
+
+# Legacy values are matched by plain lookups; unknown ones are common enough that
+# raising and catching ValueError per row would dominate the parse loop.
+_DAY_BY_VALUE = {day.value: day for day in DayOfWeek}
+_STATUS_BY_VALUE = {status.value: status for status in OrderStatus}
+_COUNT_TOKEN = re.compile(r"(?<!\S)\d+(?!\S)")
+_DAY_OFFSETS = {
+    DayOfWeek.MONDAY: 0,
+    DayOfWeek.TUESDAY: 1,
+    DayOfWeek.WEDNESDAY: 2,
+    DayOfWeek.THURSDAY: 3,
+    DayOfWeek.FRIDAY: 4,
+}
+_ORDER_UPSERT_COLUMNS = (
+    "count",
+    "day_of_week",
+    "menu_items",
+    "status",
+    "address",
+    "phone",
+    "delivery_week_start",
+    "delivery_date",
+)
+
+# Statuses covered by uq_orders_active_user_day_week.
+_ACTIVE_STATUSES = frozenset({OrderStatus.NEW, OrderStatus.CONFIRMED})
+
+# Large batches on asyncpg go through COPY into a staging table and one INSERT ... SELECT.
+COPY_THRESHOLD = 500
+_ORDER_COPY_COLUMNS = ("id", "user_id", *_ORDER_UPSERT_COLUMNS, "next_week", "unit_price")
+_ORDER_STAGE_SQL = text(
+    "CREATE TEMP TABLE IF NOT EXISTS orders_stage (LIKE orders INCLUDING DEFAULTS) ON COMMIT DROP"
+)
+_ORDER_MERGE_SQL = text(
+    f"INSERT INTO orders ({', '.join(_ORDER_COPY_COLUMNS)}) "
+    f"SELECT {', '.join(_ORDER_COPY_COLUMNS)} FROM orders_stage "
+    "ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{column} = EXCLUDED.{column}" for column in _ORDER_UPSERT_COLUMNS)
+    + ", updated_at = now()"
+)
+
+
+def _normalize_items(raw: Any) -> Iterator[str]:
+    """Yield non-blank dish names from a legacy list or comma-separated string."""
+
+    parts = raw if isinstance(raw, list) else str(raw or "").split(",")
+    for part in parts:
+        title = str(part).strip()
+        if title:
+            yield title
 
 
 def _parse_count(raw: Any) -> int:
     if isinstance(raw, int):
         return raw
-    text = str(raw)
-    for token in text.split():
-        if token.isdigit():
-            return int(token)
+    if isinstance(raw, float):
+        return int(raw)
+    # First whitespace-separated token made only of digits, e.g. "2 порции".
+    match = _COUNT_TOKEN.search(str(raw))
+    if match:
+        return int(match.group())
     raise ValueError(f"cannot parse count from {raw!r}")
 
 
 def _parse_status(raw: Any) -> OrderStatus:
-    try:
-        return OrderStatus(str(raw))
-    except ValueError:
-        return OrderStatus.NEW
+    return _STATUS_BY_VALUE.get(str(raw), OrderStatus.NEW)
 
 
-def _infer_week_start(day_name: str, created_at: int | None) -> date:
+def _infer_week_start(created_at: int | None, current_week_start: date) -> date:
     if created_at:
         dt = datetime.fromtimestamp(created_at)
         monday = dt - timedelta(days=dt.weekday())
         return monday.date()
-    # fallback to current week start
-    today = datetime.utcnow().date()
-    return today - timedelta(days=today.weekday())
+    return current_week_start
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, (DayOfWeek, OrderStatus)):
+        return value.value
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+async def _copy_orders(session, rows: list[dict[str, Any]]) -> None:
+    # Issued through the session so the staging table lives in the migration's transaction.
+    await session.execute(_ORDER_STAGE_SQL)
+    await session.execute(text("TRUNCATE orders_stage"))
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "orders_stage",
+        records=[tuple(_copy_value(row[column]) for column in _ORDER_COPY_COLUMNS) for row in rows],
+        columns=list(_ORDER_COPY_COLUMNS),
+    )
+    await session.execute(_ORDER_MERGE_SQL)
+
+
+async def _upsert_orders(session, rows: list[dict[str, Any]]) -> None:
+    if len(rows) >= COPY_THRESHOLD and session.bind.dialect.driver == "asyncpg":
+        await _copy_orders(session, rows)
+        return
+    stmt = _insert_for(session)(Order).values(rows)
+    # Re-runs refresh the legacy fields but keep the owner and pricing of known orders.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Order.id],
+        set_={column: stmt.excluded[column] for column in _ORDER_UPSERT_COLUMNS}
+        | {"updated_at": func.now()},
+    )
+    await session.execute(stmt)
 
 
-async def migrate_orders(session, users_by_telegram: dict[int, User]) -> None:
+async def migrate_orders(session) -> None:
     if not ORDERS_FILE.exists():
         logger.warning("orders.json not found — skipping order migration")
         return
-    data = json.loads(ORDERS_FILE.read_text(encoding="utf-8"))
-    for order_id, payload in data.items():
+    # One query for the whole user table; it also covers accounts missing from users.json.
+    result = await session.execute(
+        select(User.telegram_id, User.id).where(User.telegram_id.is_not(None))
+    )
+    users_by_telegram: dict[int, uuid.UUID] = dict(result.tuples().all())
+    # ON CONFLICT can only arbitrate on the id, so rows that would take an active
+    # (user, day, week) slot held by another order are skipped before they reach the DB.
+    result = await session.execute(
+        select(Order.user_id, Order.day_of_week, Order.delivery_week_start, Order.id).where(
+            Order.status.in_(_ACTIVE_STATUSES)
+        )
+    )
+    active_slots = {(user_id, day, week): order_id for user_id, day, week, order_id in result}
+    slot_by_order = {order_id: slot for slot, order_id in active_slots.items()}
+    # Orders without any date fall back to the week the migration runs in.
+    today = date.today()
+    current_week_start = today - timedelta(days=today.weekday())
+    rows: list[dict[str, Any]] = []
+    total = 0
+    for order_id, payload in _iter_legacy_items(ORDERS_FILE):
         telegram_id = int(payload.get("user_id", 0))
-        user = users_by_telegram.get(telegram_id)
-        if not user:
+        user_id = users_by_telegram.get(telegram_id)
+        if not user_id:
             logger.warning("Skipping order %s: unknown user %s", order_id, telegram_id)
             continue
         count = _parse_count(payload.get("count", 1))
         day_name = str(payload.get("day") or "Понедельник")
-        try:
-            day = DayOfWeek(day_name)
-        except ValueError:
+        day = _DAY_BY_VALUE.get(day_name)
+        if day is None:
             logger.warning("Unknown day '%s' for order %s", day_name, order_id)
             continue
         created_at = payload.get("created_at")
@@ -130,75 +284,82 @@ async def migrate_orders(session, users_by_telegram: dict[int, User]) -> None:
             try:
                 week_start = date.fromisoformat(str(delivery_week_start))
             except ValueError:
-                week_start = _infer_week_start(day_name, created_at)
+                week_start = _infer_week_start(created_at, current_week_start)
         else:
-            week_start = _infer_week_start(day_name, created_at)
-        delivery_date = week_start + timedelta(days={
-            DayOfWeek.MONDAY: 0,
-            DayOfWeek.TUESDAY: 1,
-            DayOfWeek.WEDNESDAY: 2,
-            DayOfWeek.THURSDAY: 3,
-            DayOfWeek.FRIDAY: 4,
-        }[day])
-
-        stmt = select(Order).where(Order.id == order_id)
-        existing = (await session.execute(stmt)).scalar_one_or_none()
-        menu_items_raw = payload.get("menu")
-        if isinstance(menu_items_raw, list):
-            menu_items = [str(item).strip() for item in menu_items_raw if str(item).strip()]
-        else:
-            menu_items = [part.strip() for part in str(menu_items_raw or "").split(",") if part.strip()]
-        if not menu_items:
-            menu_items = ["Не указано"]
+            week_start = _infer_week_start(created_at, current_week_start)
 
         status = _parse_status(payload.get("status"))
-        address = payload.get("address")
-        phone = payload.get("phone")
-
-        if existing:
-            existing.count = count
-            existing.day_of_week = day
-            existing.menu_items = menu_items
-            existing.status = status
-            existing.address = address
-            existing.phone = phone
-            existing.delivery_week_start = week_start
-            existing.delivery_date = delivery_date
-            logger.info("Updated order %s", order_id)
-        else:
-            order = Order(
-                id=order_id,
-                user_id=user.id,
-                day_of_week=day,
-                count=count,
-                menu_items=menu_items,
-                status=status,
-                address=address,
-                phone=phone,
-                delivery_week_start=week_start,
-                delivery_date=delivery_date,
-                next_week=False,
-                unit_price=settings.order_price_lari,
-            )
-            session.add(order)
-            logger.info("Inserted order %s", order_id)
-
-
-async def migrate_menu(session) -> None:
-    if not MENU_FILE.exists():
-        logger.warning("menu.json not found — skipping menu migration")
-        return
-    data = json.loads(MENU_FILE.read_text(encoding="utf-8"))
+        slot = (user_id, day, week_start)
+        if status in _ACTIVE_STATUSES:
+            holder = active_slots.get(slot)
+            if holder is not None and holder != order_id:
+                logger.warning(
+                    "Skipping order %s: order %s is already active for user %s on %s, week %s",
+                    order_id,
+                    holder,
+                    telegram_id,
+                    day_name,
+                    week_start,
+                )
+                continue
+        previous_slot = slot_by_order.pop(order_id, None)
+        if previous_slot is not None:
+            del active_slots[previous_slot]
+        if status in _ACTIVE_STATUSES:
+            active_slots[slot] = order_id
+            slot_by_order[order_id] = slot
+
+        menu_items = list(_normalize_items(payload.get("menu"))) or ["Не указано"]
+
+        rows.append(
+            {
+                "id": order_id,
+                "user_id": user_id,
+                "day_of_week": day,
+                "count": count,
+                "menu_items": menu_items,
+                "status": status,
+                "address": payload.get("address"),
+                "phone": payload.get("phone"),
+                "delivery_week_start": week_start,
+                "delivery_date": week_start + timedelta(days=_DAY_OFFSETS[day]),
+                "next_week": False,
+                "unit_price": settings.order_price_lari,
+            }
+        )
+        if len(rows) >= BATCH_SIZE:
+            await _upsert_orders(session, rows)
+            total += len(rows)
+            rows.clear()
+    if rows:
+        await _upsert_orders(session, rows)
+        total += len(rows)
+    logger.info("Upserted %d orders", total)
+
+
+def _load_small_json(path: Path, label: str) -> dict[str, Any] | None:
+    if not path.exists():
+        logger.warning("%s not found — skipping %s migration", path.name, label)
+        return None
+    return _loads(path.read_bytes())
+
+
+def _window_week_start(order_window: dict[str, Any] | None) -> date | None:
+    raw = (order_window or {}).get("week_start")
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(str(raw))
+    except ValueError:
+        return None
+
+
+async def migrate_menu(
+    session, data: dict[str, Any], order_window: dict[str, Any] | None
+) -> list[str]:
     week_label = str(data.get("week") or "Legacy menu")
     menu_payload = data.get("menu") or {}
-    week_start = None
-    if ORDER_WINDOW_FILE.exists():
-        try:
-            order_window_data = json.loads(ORDER_WINDOW_FILE.read_text(encoding="utf-8"))
-            if order_window_data.get("week_start"):
-                week_start = date.fromisoformat(order_window_data["week_start"])
-        except Exception:
-            week_start = None
+    week_start = _window_week_start(order_window)
 
     stmt = select(MenuWeek).where(MenuWeek.week_label == week_label)
     week = (await session.execute(stmt)).scalar_one_or_none()
@@ -211,42 +372,47 @@ async def migrate_menu(session) -> None:
         week.week_start = week_start or week.week_start
         logger.info("Updated menu week '%s'", week_label)
 
+    rows: list[dict[str, Any]] = []
+    days: list[DayOfWeek] = []
     for day_name, items in menu_payload.items():
-        try:
-            day = DayOfWeek(day_name)
-        except ValueError:
+        day = _DAY_BY_VALUE.get(day_name)
+        if day is None:
             logger.warning("Skip menu day '%s'", day_name)
             continue
-        normalized = []
-        if isinstance(items, list):
-            normalized = [str(item).strip() for item in items if str(item).strip()]
-        else:
-            normalized = [part.strip() for part in str(items).split(",") if part.strip()]
-        stmt_items = select(MenuItem).where(MenuItem.week_id == week.id, MenuItem.day_of_week == day)
-        existing_items = (await session.execute(stmt_items)).scalars().all()
-        for idx, title in enumerate(normalized):
-            if idx < len(existing_items):
-                existing_items[idx].title = title
-                existing_items[idx].position = idx
-            else:
-                session.add(MenuItem(week_id=week.id, day_of_week=day, title=title, position=idx))
-        for idx in range(len(normalized), len(existing_items)):
-            await session.delete(existing_items[idx])
-
-
-async def migrate_order_window(session) -> None:
-    if not ORDER_WINDOW_FILE.exists():
-        logger.warning("order_window.json not found — skipping order window migration")
+        days.append(day)
+        rows.extend(
+            {"week_id": week.id, "day_of_week": day, "title": title, "position": idx}
+            for idx, title in enumerate(_normalize_items(items))
+        )
+    # Days present in the dump are replaced wholesale; other days are left as they are.
+    if days:
+        await session.execute(
+            delete(MenuItem).where(MenuItem.week_id == week.id, MenuItem.day_of_week.in_(days))
+        )
+    if rows:
+        await session.execute(insert(MenuItem), rows)
+    # Cached item titles for the replaced days; the caller drops them after commit.
+    if week.week_start is None:
+        return []
+    return [menu_items_cache_key(week.week_start, day) for day in days]
+
+
+async def _invalidate_menu_cache(keys: list[str]) -> None:
+    # Orders validate against cached titles for menu_cache_ttl_seconds; drop the replaced
+    # days only now that the new items are committed.
+    if redis_client is None or not keys:
         return
-    data = json.loads(ORDER_WINDOW_FILE.read_text(encoding="utf-8"))
+    try:
+        await redis_client.delete(*keys)
+    except RedisError as error:
+        logger.warning(
+            "Could not drop %d cached menu keys (%s); flush them by hand", len(keys), error
+        )
+
+
+async def migrate_order_window(session, data: dict[str, Any]) -> None:
     enabled = bool(data.get("next_week_enabled"))
-    week_start_val = data.get("week_start")
-    week_start = None
-    if week_start_val:
-        try:
-            week_start = date.fromisoformat(str(week_start_val))
-        except ValueError:
-            week_start = None
+    week_start = _window_week_start(data)
     stmt = select(OrderWindow)
     window = (await session.execute(stmt.limit(1))).scalar_one_or_none()
     if not window:
@@ -260,18 +426,35 @@ async def migrate_order_window(session) -> None:
 
 
 async def migrate() -> None:
+    # The small files are read once here; order_window.json feeds two steps.
+    menu_data = _load_small_json(MENU_FILE, "menu")
+    order_window_data = _load_small_json(ORDER_WINDOW_FILE, "order window")
+    stale_menu_keys: list[str] = []
     async with async_session_factory() as session:
-        users_map = await migrate_users(session)
-        await migrate_menu(session)
-        await migrate_order_window(session)
-        await migrate_orders(session, users_map)
+        await migrate_users(session)
+        if menu_data is not None:
+            stale_menu_keys = await migrate_menu(session, menu_data, order_window_data)
+        if order_window_data is not None:
+            await migrate_order_window(session, order_window_data)
+        await migrate_orders(session)
         await session.commit()
-        logger.info("Migration finished successfully")
+    await _invalidate_menu_cache(stale_menu_keys)
+    logger.info("Migration finished successfully")
+
+
+def _loop_factory():
+    try:
+        import uvloop
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return uvloop.new_event_loop
 
 
 def main() -> None:
     logger.info("Starting migration using database %s", settings.database_url)
-    asyncio.run(migrate())
+    # uvloop ships with uvicorn[standard]; the stdlib loop is the fallback.
+    with asyncio.Runner(loop_factory=_loop_factory()) as runner:
+        runner.run(migrate())
 
 
 if __name__ == "__main__":
@@ -2,25 +2,31 @@
 
 from __future__ import annotations
 
+import argparse
 import asyncio
 import sys
 from datetime import date, datetime, time, timedelta
 from pathlib import Path
+from typing import NamedTuple
 
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 ROOT = Path(__file__).resolve().parents[1]
 BACKEND_ROOT = ROOT / "backend"
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
-from app.core.security import hash_password
+from app.core.redis import redis_client
 from app.db.models.enums import DayOfferStatus, DayOfWeek, UserRole
 from app.db.models.menu import DayOffer, MenuItem, MenuWeek
 from app.db.models.preset import PlannerPreset
 from app.db.models.order_window import OrderWindow
 from app.db.models.user import User
-from app.db.session import async_session_factory
+from app.db.session import async_session_factory, engine
+from app.domain.menu import menu_items_cache_key
 
 SAMPLE_MENU = {
     "Текущая неделя": {
@@ -39,30 +45,74 @@ SAMPLE_MENU = {
     },
 }
 
-DAY_PHOTOS = {
-    DayOfWeek.MONDAY: "/dishphotos/Monday.png",
-    DayOfWeek.TUESDAY: "/dishphotos/Tuesday.png",
-    DayOfWeek.WEDNESDAY: "/dishphotos/Wednesday.png",
-    DayOfWeek.THURSDAY: "/dishphotos/Thursday.png",
-    DayOfWeek.FRIDAY: "/dishphotos/Friday.png",
-}
 
-DAY_META = {
-    DayOfWeek.MONDAY: {"calories": 720, "allergens": ["gluten", "egg"], "badge": "Хит недели"},
-    DayOfWeek.TUESDAY: {"calories": 680, "allergens": ["gluten"], "badge": "Легко"},
-    DayOfWeek.WEDNESDAY: {"calories": 750, "allergens": ["gluten", "milk"]},
-    DayOfWeek.THURSDAY: {"calories": 690, "allergens": ["fish", "gluten"], "badge": "Рыбный день"},
-    DayOfWeek.FRIDAY: {"calories": 810, "allergens": ["gluten"], "badge": "Пятница"},
+# seed_menu() gives the current week this label; seed() probes for it.
+_CURRENT_SAMPLE_LABEL = next(iter(SAMPLE_MENU))
+
+
+class DayConfig(NamedTuple):
+    offset: int
+    photo: str
+    calories: int
+    allergens: tuple[str, ...]
+    badge: str | None = None
+    status: DayOfferStatus = DayOfferStatus.AVAILABLE
+    price_amount: int = 1500
+    price_currency: str = "GEL"
+    portion_limit: int = 120
+    notes: str | None = None
+
+
+# Everything the seed needs per weekday, resolved with a single lookup.
+DAY_TABLE = {
+    DayOfWeek.MONDAY: DayConfig(0, "/dishphotos/Monday.png", 720, ("gluten", "egg"), "Хит недели"),
+    DayOfWeek.TUESDAY: DayConfig(1, "/dishphotos/Tuesday.png", 680, ("gluten",), "Легко"),
+    DayOfWeek.WEDNESDAY: DayConfig(2, "/dishphotos/Wednesday.png", 750, ("gluten", "milk")),
+    DayOfWeek.THURSDAY: DayConfig(
+        3, "/dishphotos/Thursday.png", 690, ("fish", "gluten"), "Рыбный день"
+    ),
+    DayOfWeek.FRIDAY: DayConfig(4, "/dishphotos/Friday.png", 810, ("gluten",), "Пятница"),
 }
 
-DAY_INDEX = {
-    DayOfWeek.MONDAY: 0,
-    DayOfWeek.TUESDAY: 1,
-    DayOfWeek.WEDNESDAY: 2,
-    DayOfWeek.THURSDAY: 3,
-    DayOfWeek.FRIDAY: 4,
+# Week-independent parts of the seed rows, derived once at import.
+_SAMPLE_ITEMS = {
+    label: [
+        (day, position, title)
+        for day, dishes in mapping.items()
+        for position, title in enumerate(dishes)
+    ]
+    for label, mapping in SAMPLE_MENU.items()
+}
+_OFFER_TEMPLATES = {
+    day: {
+        "status": cfg.status,
+        "price_amount": cfg.price_amount,
+        "price_currency": cfg.price_currency,
+        "portion_limit": cfg.portion_limit,
+        "portions_reserved": 0,
+        "calories": cfg.calories,
+        "allergens": list(cfg.allergens),
+        "badge": cfg.badge,
+        "photo_url": cfg.photo,
+        "notes": cfg.notes,
+    }
+    for day, cfg in DAY_TABLE.items()
 }
 
+_OFFER_UPSERT_COLUMNS = (
+    "status",
+    "price_amount",
+    "price_currency",
+    "portion_limit",
+    "portions_reserved",
+    "calories",
+    "allergens",
+    "badge",
+    "order_deadline",
+    "photo_url",
+    "notes",
+)
+
 SAMPLE_PRESETS = [
     {
         "slug": "full-week",
@@ -90,129 +140,136 @@ SAMPLE_PRESETS = [
     },
 ]
 
+# Dev-only credentials (admin123 / customer123), hashed ahead of time with the argon2id
+# parameters from app.core.security so the seed doesn't spend ~0.25s hashing on each run.
 SAMPLE_USERS = [
     {
         "email": "admin@batumi.lunch",
-        "password": "admin123",
+        "password_hash": (
+            "$argon2id$v=19$m=47104,t=3,p=2$gBACgFAqBaBUqnVO6X0PwQ"
+            "$u7dF4rAS1G87eEoBDfUXvAPZZ7NxFGXgSWPfXAGp1pU"
+        ),
         "role": UserRole.ADMIN,
-        "address": None
+        "address": None,
     },
     {
         "email": "customer@batumi.lunch",
-        "password": "customer123",
+        "password_hash": (
+            "$argon2id$v=19$m=47104,t=3,p=2$bA2BUKp17l0LAYDw3hvDuA"
+            "$Kz/qMq2y/O3eJnBlHwytgy0Qt71VGreMMT/e2G4hn8M"
+        ),
         "role": UserRole.CUSTOMER,
         "address": "ул. Горгиладзе, 5",
     },
 ]
 
 
+def _insert_for(session):
+    # Both backends the seed runs against support INSERT ... ON CONFLICT.
+    return pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+
 async def seed_users(session) -> None:
-    for payload in SAMPLE_USERS:
-        stmt = select(User).where(User.email == payload["email"])
-        existing = (await session.execute(stmt)).scalar_one_or_none()
-        if existing:
-            continue
-        role = payload["role"]
-        if isinstance(role, UserRole):
-            role_value = role.value
-        else:
-            role_value = UserRole(role).value
-
-        user = User(
-            email=payload["email"],
-            password_hash=hash_password(payload["password"]),
-            role=role_value,
-            address=payload["address"],
-            is_active=True,
+    # One statement for all sample users; existing accounts are left untouched.
+    rows = [
+        {
+            "email": payload["email"],
+            "password_hash": payload["password_hash"],
+            "role": UserRole(payload["role"]),
+            "address": payload["address"],
+            "is_active": True,
+        }
+        for payload in SAMPLE_USERS
+    ]
+    stmt = _insert_for(session)(User).values(rows)
+    stmt = stmt.on_conflict_do_nothing(index_elements=[User.email])
+    await session.execute(stmt)
+
+
+async def seed_menu(session) -> list[str]:
+    today = date.today()
+    base_week = today - timedelta(days=today.weekday())
+    # Both sample weeks in one upsert keyed by the unique week_start; RETURNING hands back
+    # the persistent rows, so no lookup or flush is needed for their ids.
+    week_rows = [
+        {"week_label": label, "week_start": base_week + timedelta(days=offset * 7)}
+        for offset, label in enumerate(SAMPLE_MENU)
+    ]
+    stmt = _insert_for(session)(MenuWeek).values(week_rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MenuWeek.week_start],
+        set_={"week_label": stmt.excluded.week_label, "updated_at": func.now()},
+    ).returning(MenuWeek)
+    result = await session.scalars(stmt, execution_options={"populate_existing": True})
+    weeks = {week.week_label: week for week in result}
+
+    # All sample weeks are written together: one DELETE, one batched INSERT, one upsert.
+    item_rows = []
+    offer_rows = []
+    for label, mapping in SAMPLE_MENU.items():
+        week = weeks[label]
+        item_rows.extend(
+            {"week_id": week.id, "day_of_week": day, "title": title, "position": position}
+            for day, position, title in _SAMPLE_ITEMS[label]
         )
-        session.add(user)
-
-
-async def seed_menu(session) -> None:
-    base_week = date.today() - timedelta(days=date.today().weekday())
-    for offset, (label, mapping) in enumerate(SAMPLE_MENU.items()):
-        week_start = base_week + timedelta(days=offset * 7)
-        stmt = select(MenuWeek).where(MenuWeek.week_label == label)
-        week = (await session.execute(stmt)).scalar_one_or_none()
-        if not week:
-            week = MenuWeek(week_label=label, week_start=week_start)
-            session.add(week)
-            await session.flush()
-        else:
-            week.week_start = week_start
         photos = dict(week.day_photos or {})
-        for day, dishes in mapping.items():
-            stmt_items = select(MenuItem).where(MenuItem.week_id == week.id, MenuItem.day_of_week == day)
-            existing = (await session.execute(stmt_items)).scalars().all()
-            for idx, dish in enumerate(dishes):
-                if idx < len(existing):
-                    existing[idx].title = dish
-                    existing[idx].position = idx
-                else:
-                    session.add(MenuItem(week_id=week.id, day_of_week=day, title=dish, position=idx))
-            for idx in range(len(dishes), len(existing)):
-                await session.delete(existing[idx])
-
-            meta = DAY_META.get(day, {})
-            deadline_date = week_start + timedelta(days=DAY_INDEX[day])
-            order_deadline = datetime.combine(deadline_date, time(hour=10, minute=0))
-            stmt_offer = select(DayOffer).where(DayOffer.week_id == week.id, DayOffer.day_of_week == day)
-            offer = (await session.execute(stmt_offer)).scalar_one_or_none()
-            price_amount = meta.get("price_amount", 1500)
-            price_currency = meta.get("price_currency", "GEL")
-            portion_limit = meta.get("portion_limit", 120)
-            allergens = list(meta.get("allergens", []))
-            if offer:
-                offer.status = meta.get("status", DayOfferStatus.AVAILABLE)
-                offer.price_amount = price_amount
-                offer.price_currency = price_currency
-                offer.portion_limit = portion_limit
-                offer.portions_reserved = 0
-                offer.calories = meta.get("calories")
-                offer.allergens = allergens
-                offer.badge = meta.get("badge")
-                offer.order_deadline = order_deadline
-                offer.photo_url = DAY_PHOTOS.get(day)
-                offer.notes = meta.get("notes")
-            else:
-                session.add(
-                    DayOffer(
-                        week_id=week.id,
-                        day_of_week=day,
-                        status=meta.get("status", DayOfferStatus.AVAILABLE),
-                        price_amount=price_amount,
-                        price_currency=price_currency,
-                        portion_limit=portion_limit,
-                        portions_reserved=0,
-                        calories=meta.get("calories"),
-                        allergens=allergens,
-                        badge=meta.get("badge"),
-                        order_deadline=order_deadline,
-                        photo_url=DAY_PHOTOS.get(day),
-                        notes=meta.get("notes"),
-                    )
-                )
-            photos[day.value] = DAY_PHOTOS.get(day)
+        for day in mapping:
+            cfg = DAY_TABLE[day]
+            deadline_date = week.week_start + timedelta(days=cfg.offset)
+            offer_rows.append(
+                {
+                    **_OFFER_TEMPLATES[day],
+                    "week_id": week.id,
+                    "day_of_week": day,
+                    "order_deadline": datetime.combine(deadline_date, time(hour=10, minute=0)),
+                }
+            )
+            photos[day.value] = cfg.photo
         week.day_photos = photos
 
+    seeded_days = [(row["week_id"], row["day_of_week"]) for row in offer_rows]
+    await session.execute(
+        delete(MenuItem).where(tuple_(MenuItem.week_id, MenuItem.day_of_week).in_(seeded_days))
+    )
+    await session.execute(insert(MenuItem), item_rows)
+    # Upsert against uq_day_offers_week_day instead of SELECT + branch per day.
+    stmt_offers = _insert_for(session)(DayOffer).values(offer_rows)
+    stmt_offers = stmt_offers.on_conflict_do_update(
+        index_elements=[DayOffer.week_id, DayOffer.day_of_week],
+        set_={column: stmt_offers.excluded[column] for column in _OFFER_UPSERT_COLUMNS}
+        | {"updated_at": func.now()},
+    )
+    await session.execute(stmt_offers)
+    # Cached item titles for the rewritten days; the caller drops them after commit.
+    return [
+        menu_items_cache_key(weeks[label].week_start, day)
+        for label, mapping in SAMPLE_MENU.items()
+        for day in mapping
+    ]
+
 
 async def seed_future_weeks(session, *, total_weeks: int = 6) -> None:
     """Ensure placeholder menu weeks exist several weeks ahead."""
 
-    base_week_start = date.today() - timedelta(days=date.today().weekday())
+    today = date.today()
+    base_week_start = today - timedelta(days=today.weekday())
     result = await session.execute(select(MenuWeek.week_start))
     existing_starts = {week_start for week_start in result.scalars() if week_start is not None}
 
+    rows = []
     for index in range(len(SAMPLE_MENU), len(SAMPLE_MENU) + total_weeks):
         week_start = base_week_start + timedelta(days=index * 7)
         if week_start in existing_starts:
             continue
         label = f"Будущая неделя {index - len(SAMPLE_MENU) + 1}"
-        session.add(MenuWeek(week_label=label, week_start=week_start))
+        rows.append({"week_label": label, "week_start": week_start})
+    if rows:
+        await session.execute(insert(MenuWeek), rows)
 
 
 async def seed_order_window(session) -> None:
-    next_week_start = date.today() + timedelta(days=(7 - date.today().weekday()) % 7 or 7)
+    today = date.today()
+    next_week_start = today + timedelta(days=(7 - today.weekday()) % 7 or 7)
     stmt = select(OrderWindow)
     window = (await session.execute(stmt.limit(1))).scalar_one_or_none()
     if not window:
@@ -224,43 +281,75 @@ async def seed_order_window(session) -> None:
 
 
 async def seed_presets(session) -> None:
-    for payload in SAMPLE_PRESETS:
-        stmt = select(PlannerPreset).where(PlannerPreset.slug == payload["slug"])
-        preset = (await session.execute(stmt)).scalar_one_or_none()
-        if preset:
-            preset.title = payload["title"]
-            preset.description = payload["description"]
-            preset.days = payload["days"]
-            preset.portions = payload["portions"]
-            preset.sort_order = payload["sort_order"]
-            preset.is_active = True
-        else:
-            session.add(
-                PlannerPreset(
-                    slug=payload["slug"],
-                    title=payload["title"],
-                    description=payload["description"],
-                    days=payload["days"],
-                    portions=payload["portions"],
-                    sort_order=payload["sort_order"],
-                    is_active=True,
-                )
-            )
+    rows = [{**payload, "is_active": True} for payload in SAMPLE_PRESETS]
+    stmt = _insert_for(session)(PlannerPreset).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PlannerPreset.slug],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("title", "description", "days", "portions", "sort_order", "is_active")
+        }
+        | {"updated_at": func.now()},
+    )
+    await session.execute(stmt)
 
 
-async def seed() -> None:
-    async with async_session_factory() as session:
+async def seed(*, force: bool = False) -> bool:
+    # One BEGIN/COMMIT for the whole seed; an error anywhere rolls everything back.
+    async with async_session_factory.begin() as session:
+        if not force:
+            # This Monday carries the seed's own label only once the seed has run this week;
+            # placeholder and admin-created weeks are labelled differently. A re-run costs
+            # this single probe instead of the full set of upserts.
+            today = date.today()
+            probe = select(MenuWeek.id).where(
+                MenuWeek.week_start == today - timedelta(days=today.weekday()),
+                MenuWeek.week_label == _CURRENT_SAMPLE_LABEL,
+            )
+            if await session.scalar(probe) is not None:
+                return False
         await seed_users(session)
-        await seed_menu(session)
+        stale_menu_keys = await seed_menu(session)
         await seed_future_weeks(session)
         await seed_order_window(session)
         await seed_presets(session)
-        await session.commit()
+    await _invalidate_menu_cache(stale_menu_keys)
+    return True
+
+
+async def _invalidate_menu_cache(keys: list[str]) -> None:
+    # Orders validate against cached titles for menu_cache_ttl_seconds; drop the rewritten
+    # days only now that the new items are committed.
+    if redis_client is None or not keys:
+        return
+    try:
+        await redis_client.delete(*keys)
+    except RedisError as error:
+        print(f"Could not drop {len(keys)} cached menu keys ({error}); flush them by hand.")
+
+
+def _loop_factory():
+    try:
+        import uvloop
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return uvloop.new_event_loop
 
 
 def main() -> None:
-    asyncio.run(seed())
-    print("Seed completed.")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-apply the seed even if the current week is already present",
+    )
+    args = parser.parse_args()
+    # settings.debug turns on SQL echo for the API; the seed has no use for it.
+    engine.echo = False
+    # uvloop ships with uvicorn[standard]; the stdlib loop is the fallback.
+    with asyncio.Runner(loop_factory=_loop_factory()) as runner:
+        applied = runner.run(seed(force=args.force))
+    print("Seed completed." if applied else "Seed already applied; use --force to re-run.")
 
 
 if __name__ == "__main__":